@@ -0,0 +1,59 @@
+"""
+Stress test of allele name parsing with pathological inputs, e.g. the
+multi-megabyte "allele" fields sometimes submitted to public services.
+
+For each input shape and length, reports the worst time taken by
+normalize_allele_name to either return or raise. Since names longer than
+mhcnames.MAX_ALLELE_NAME_LENGTH are rejected up front and parsing is linear
+below that, the worst case should stay flat as inputs grow.
+
+Usage:
+    python benchmarks/benchmark_adversarial_inputs.py
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import time
+
+from mhcnames import normalize_allele_name, MAX_ALLELE_NAME_LENGTH
+
+shapes = {
+    "letters": lambda n: "A" * n,
+    "digits": lambda n: "A" + "0" * (n - 1),
+    "separators": lambda n: "-" * n,
+    "prefixes": lambda n: ("HLA-" * n)[:n],
+    "slashes": lambda n: "DRB1*01:01" + "/" * (n - 10),
+    "underscores": lambda n: "HLA_" + "_" * (n - 4),
+    "sla_colons": lambda n: "SLA-1*" + ":" * (n - 6),
+    "trailing_spaces": lambda n: "HLA-A*02:01" + " " * (n - 11),
+    "unicode": lambda n: u"ß" * n,
+}
+
+lengths = [16, 64, MAX_ALLELE_NAME_LENGTH, 10 ** 3, 10 ** 5, 10 ** 7]
+
+
+def worst_latency(name, repeat=5):
+    worst = 0.0
+    for _ in range(repeat):
+        start = time.time()
+        try:
+            normalize_allele_name(name)
+        except Exception:
+            pass
+        worst = max(worst, time.time() - start)
+    return worst
+
+
+def main():
+    print("%-16s %s" % ("shape", " ".join("%10d" % n for n in lengths)))
+    overall = 0.0
+    for shape, make_name in sorted(shapes.items()):
+        latencies = [worst_latency(make_name(n)) for n in lengths]
+        overall = max(overall, max(latencies))
+        print("%-16s %s" % (
+            shape, " ".join("%8.1fus" % (t * 10 ** 6) for t in latencies)))
+    print("worst case: %.1fus" % (overall * 10 ** 6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares reading the allele column of a delimited file with
+iter_normalized_alleles_in_file against the usual text-mode loop of
+decoding and splitting every line, and normalize_allele_name_bytes against
+decoding each name before calling normalize_allele_name.
+
+Usage:
+    python benchmarks/benchmark_bytes_input.py [n_rows]
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from mhcnames import (
+    generate_allele_names,
+    iter_normalized_alleles_in_file,
+    normalize_allele_name,
+    normalize_allele_name_bytes,
+)
+
+# a narrow table of predictions and a wide, VCF-like table with the allele
+# in the second of many columns
+layouts = {
+    "narrow": lambda i, name: "sample%d\t%s\t0.5\n" % (i, name),
+    "wide": lambda i, name: "sample%d\t%s\t%s\n" % (
+        i, name, "\t".join(["PASS", "0/1", "DP=35;AF=0.5;MQ=60"] * 4)),
+}
+
+
+def text_loop(path):
+    results = []
+    with open(path) as f:
+        for line in f:
+            results.append(normalize_allele_name(line.rstrip("\n").split("\t")[1]))
+    return results
+
+
+def mmap_loop(path):
+    return list(iter_normalized_alleles_in_file(path, column=1))
+
+
+def timed(fn, *args):
+    start = time.time()
+    result = fn(*args)
+    return time.time() - start, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    # a few thousand distinct spellings, as in a real cohort
+    names = [
+        allele.name
+        for allele in generate_allele_names(2000, seed=0, malformed_fraction=0)]
+    directory = tempfile.mkdtemp()
+    try:
+        for layout, format_line in sorted(layouts.items()):
+            path = os.path.join(directory, "%s.tsv" % layout)
+            with open(path, "w") as f:
+                for i in range(n_rows):
+                    f.write(format_line(i, names[i % len(names)]))
+            text_time, text_result = timed(text_loop, path)
+            mmap_time, mmap_result = timed(mmap_loop, path)
+            assert text_result == mmap_result
+            print("%-8s text loop %6.2fs  iter_normalized_alleles_in_file %6.2fs" % (
+                layout, text_time, mmap_time))
+    finally:
+        shutil.rmtree(directory)
+
+    encoded = [names[i % len(names)].encode("utf-8") for i in range(n_rows)]
+    decode_time, _ = timed(
+        lambda: [normalize_allele_name(name.decode("utf-8")) for name in encoded])
+    bytes_time, _ = timed(
+        lambda: [normalize_allele_name_bytes(name) for name in encoded])
+    print("names    decode+normalize %6.2fs  normalize_allele_name_bytes %6.2fs" % (
+        decode_time, bytes_time))
+
+
+if __name__ == "__main__":
+    main()
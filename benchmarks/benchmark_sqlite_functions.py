@@ -0,0 +1,72 @@
+"""
+Compares normalizing an allele column inside SQLite with
+register_sqlite_functions against the usual loop of fetching every row,
+normalizing in Python and writing the results back.
+
+Usage:
+    python benchmarks/benchmark_sqlite_functions.py [n_rows]
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import sqlite3
+import sys
+import time
+
+from mhcnames import (
+    AlleleParseError,
+    generate_allele_names,
+    normalize_allele_name,
+    register_sqlite_functions,
+)
+
+
+def make_connection(names):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE samples (id INTEGER PRIMARY KEY, allele TEXT)")
+    connection.executemany(
+        "INSERT INTO samples VALUES (?, ?)", enumerate(names))
+    connection.commit()
+    return connection
+
+
+def normalize_in_database(connection):
+    register_sqlite_functions(connection)
+    connection.execute("UPDATE samples SET allele = mhc_normalize(allele)")
+    connection.commit()
+
+
+def normalize_in_python(connection):
+    cache = {}
+    updates = []
+    for (row_id, raw_allele) in connection.execute("SELECT id, allele FROM samples"):
+        if raw_allele not in cache:
+            try:
+                cache[raw_allele] = normalize_allele_name(raw_allele)
+            except (AlleleParseError, ValueError):
+                cache[raw_allele] = None
+        updates.append((cache[raw_allele], row_id))
+    connection.executemany("UPDATE samples SET allele = ? WHERE id = ?", updates)
+    connection.commit()
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    names = [allele.name for allele in generate_allele_names(n_rows, seed=0)]
+    print("%d rows, %d distinct spellings" % (n_rows, len(set(names))))
+    results = {}
+    for label, fn in [
+            ("fetch, normalize, write back", normalize_in_python),
+            ("UPDATE with mhc_normalize", normalize_in_database)]:
+        connection = make_connection(names)
+        start = time.time()
+        fn(connection)
+        elapsed = time.time() - start
+        print("%-30s %8.2fs" % (label, elapsed))
+        results[label] = connection.execute(
+            "SELECT allele FROM samples ORDER BY id").fetchall()
+    assert len(set(tuple(rows) for rows in results.values())) == 1
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,78 @@
 from .allele_name import (parse_allele_name, AlleleName)
-from .normalization import (compact_allele_name, normalize_allele_name)
+from .allele_set import AlleleSet, pairwise_match_counts
+from .allele_keys import encode_allele, decode_allele, encode_allele_name
+from .normalization import (
+    compact_allele_name,
+    normalize_allele_name,
+    set_persistent_cache,
+    get_persistent_cache,
+)
+from .normalizer import Normalizer
+from .persistent_cache import PersistentCache, warm_persistent_cache
+from .bytes_input import (
+    parse_allele_name_bytes,
+    normalize_allele_name_bytes,
+    compact_allele_name_bytes,
+    iter_normalized_alleles_in_file,
+)
+from .corpus_summary import summarize_alleles, CorpusSummary
+from .genotype import (
+    Genotype,
+    LocusGenotype,
+    parse_genotype,
+    parse_genotypes,
+)
+from .grouping import (
+    AlleleGroup,
+    group_peptides_by_allele,
+    scatter_group_results,
+)
+from .sqlite_functions import register_sqlite_functions
+from .synthetic import generate_allele_names, SyntheticAllele
 from .class2 import parse_classi_or_classii_allele_name
 from .species import (
     species_name_to_prefixes,
     prefix_to_species_name,
 )
 from .allele_parse_error import AlleleParseError
+from .parsing_helpers import MAX_ALLELE_NAME_LENGTH
 
 __version__ = "0.4.8"
 
 __all__ = [
+    "AlleleGroup",
     "AlleleName",
     "AlleleParseError",
+    "AlleleSet",
     "compact_allele_name",
+    "CorpusSummary",
+    "Genotype",
+    "compact_allele_name_bytes",
+    "decode_allele",
+    "encode_allele",
+    "encode_allele_name",
+    "generate_allele_names",
+    "get_persistent_cache",
+    "LocusGenotype",
+    "MAX_ALLELE_NAME_LENGTH",
+    "Normalizer",
+    "group_peptides_by_allele",
+    "iter_normalized_alleles_in_file",
     "normalize_allele_name",
+    "normalize_allele_name_bytes",
+    "pairwise_match_counts",
     "parse_allele_name",
+    "parse_allele_name_bytes",
     "parse_classi_or_classii_allele_name",
+    "parse_genotype",
+    "parse_genotypes",
+    "PersistentCache",
+    "register_sqlite_functions",
+    "scatter_group_results",
+    "set_persistent_cache",
     "species_name_to_prefixes",
-    "prefix_to_species_name"
+    "summarize_alleles",
+    "SyntheticAllele",
+    "prefix_to_species_name",
+    "warm_persistent_cache",
 ]
@@ -0,0 +1,313 @@
+/*
+ * Copyright (c) 2017. Mount Sinai School of Medicine
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *       http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*
+ * Optional compiled versions of the scanning functions in parsing_helpers.py
+ * and of the prefix search in species.py. Every function here must give
+ * exactly the same results as its pure Python counterpart, which is checked
+ * by test/test_speedups.py.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+enum char_class {
+    SEPARATOR,
+    ALPHANUM,
+    LETTER,
+    DIGIT,
+    NOT_DIGIT,
+};
+
+static int
+char_matches(Py_UCS4 c, enum char_class cls)
+{
+    switch (cls) {
+    case SEPARATOR:
+        return c == ':' || c == '*' || c == '-';
+    case ALPHANUM:
+        return Py_UNICODE_ISALNUM(c);
+    case LETTER:
+        return Py_UNICODE_ISALPHA(c);
+    case DIGIT:
+        return Py_UNICODE_ISDIGIT(c);
+    case NOT_DIGIT:
+        return !Py_UNICODE_ISDIGIT(c);
+    }
+    return 0;
+}
+
+/* Returns the tuple (allele[:pos], allele[pos:]) */
+static PyObject *
+split_at(PyObject *allele, Py_ssize_t pos)
+{
+    Py_ssize_t length = PyUnicode_GET_LENGTH(allele);
+    PyObject *head, *tail, *result;
+
+    head = PyUnicode_Substring(allele, 0, pos);
+    if (head == NULL) {
+        return NULL;
+    }
+    tail = PyUnicode_Substring(allele, pos, length);
+    if (tail == NULL) {
+        Py_DECREF(head);
+        return NULL;
+    }
+    result = PyTuple_Pack(2, head, tail);
+    Py_DECREF(head);
+    Py_DECREF(tail);
+    return result;
+}
+
+static PyObject *
+parse_char_class(PyObject *args, PyObject *kwargs, enum char_class cls,
+                 const char *format)
+{
+    static char *kwlist[] = {"allele", "max_len", NULL};
+    PyObject *allele;
+    PyObject *max_len_obj = Py_None;
+    Py_ssize_t length, max_len, pos;
+    int kind;
+    const void *data;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, format, kwlist,
+                                     &PyUnicode_Type, &allele, &max_len_obj)) {
+        return NULL;
+    }
+    if (PyUnicode_READY(allele) < 0) {
+        return NULL;
+    }
+    length = PyUnicode_GET_LENGTH(allele);
+    if (max_len_obj == Py_None) {
+        max_len = length;
+    } else {
+        max_len = PyNumber_AsSsize_t(max_len_obj, PyExc_OverflowError);
+        if (max_len == -1 && PyErr_Occurred()) {
+            return NULL;
+        }
+        if (max_len > length) {
+            max_len = length;
+        }
+    }
+    kind = PyUnicode_KIND(allele);
+    data = PyUnicode_DATA(allele);
+    pos = 0;
+    while (pos < max_len && char_matches(PyUnicode_READ(kind, data, pos), cls)) {
+        pos++;
+    }
+    return split_at(allele, pos);
+}
+
+static PyObject *
+parse_separator(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    return parse_char_class(args, kwargs, SEPARATOR, "O!|O:parse_separator");
+}
+
+static PyObject *
+parse_alphanum(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    return parse_char_class(args, kwargs, ALPHANUM, "O!|O:parse_alphanum");
+}
+
+static PyObject *
+parse_letters(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    return parse_char_class(args, kwargs, LETTER, "O!|O:parse_letters");
+}
+
+static PyObject *
+parse_numbers(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    return parse_char_class(args, kwargs, DIGIT, "O!|O:parse_numbers");
+}
+
+static PyObject *
+parse_not_numbers(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    return parse_char_class(args, kwargs, NOT_DIGIT, "O!|O:parse_not_numbers");
+}
+
+static PyObject *
+parse_until(PyObject *self, PyObject *args)
+{
+    PyObject *allele, *sep;
+    Py_ssize_t length, pos;
+    Py_UCS4 sep_char;
+    int kind;
+    const void *data;
+
+    if (!PyArg_ParseTuple(args, "O!O!:parse_until",
+                          &PyUnicode_Type, &allele, &PyUnicode_Type, &sep)) {
+        return NULL;
+    }
+    if (PyUnicode_READY(allele) < 0 || PyUnicode_READY(sep) < 0) {
+        return NULL;
+    }
+    length = PyUnicode_GET_LENGTH(allele);
+    if (PyUnicode_GET_LENGTH(sep) != 1) {
+        /* a single character never equals a longer or empty string */
+        return split_at(allele, length);
+    }
+    sep_char = PyUnicode_READ_CHAR(sep, 0);
+    kind = PyUnicode_KIND(allele);
+    data = PyUnicode_DATA(allele);
+    pos = 0;
+    while (pos < length && PyUnicode_READ(kind, data, pos) != sep_char) {
+        pos++;
+    }
+    return split_at(allele, pos);
+}
+
+/*
+ * Case insensitive test of whether name starts with prefix, where name
+ * is known to be ASCII and the prefix is shorter than the name.
+ */
+static int
+ascii_startswith_nocase(const Py_UCS1 *name, PyObject *prefix)
+{
+    Py_ssize_t i, n = PyUnicode_GET_LENGTH(prefix);
+    int kind = PyUnicode_KIND(prefix);
+    const void *data = PyUnicode_DATA(prefix);
+    Py_UCS4 c;
+
+    for (i = 0; i < n; i++) {
+        c = PyUnicode_READ(kind, data, i);
+        if (c > 127 || Py_TOUPPER(name[i]) != Py_TOUPPER((Py_UCS1) c)) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+static PyObject *
+split_prefix(PyObject *self, PyObject *args)
+{
+    PyObject *name, *prefixes, *seps;
+    PyObject *prefix_seq = NULL, *name_upper = NULL;
+    PyObject *species = Py_None, *rest = NULL, *result = NULL;
+    Py_ssize_t name_len, i, n_prefixes, n;
+    int is_ascii, matched;
+
+    if (!PyArg_ParseTuple(args, "O!OO!:split_prefix",
+                          &PyUnicode_Type, &name, &prefixes,
+                          &PyUnicode_Type, &seps)) {
+        return NULL;
+    }
+    if (PyUnicode_READY(name) < 0) {
+        return NULL;
+    }
+    prefix_seq = PySequence_Fast(prefixes, "prefixes must be a sequence");
+    if (prefix_seq == NULL) {
+        return NULL;
+    }
+    name_len = PyUnicode_GET_LENGTH(name);
+    is_ascii = PyUnicode_IS_ASCII(name);
+    if (!is_ascii) {
+        /* uppercasing non-ASCII text can change its length so defer to
+           str.upper to match the pure Python implementation */
+        name_upper = PyObject_CallMethod(name, "upper", NULL);
+        if (name_upper == NULL) {
+            goto done;
+        }
+    }
+    n_prefixes = PySequence_Fast_GET_SIZE(prefix_seq);
+    for (i = 0; i < n_prefixes; i++) {
+        PyObject *prefix = PySequence_Fast_GET_ITEM(prefix_seq, i);
+        if (!PyUnicode_Check(prefix)) {
+            PyErr_SetString(PyExc_TypeError, "prefixes must be strings");
+            goto done;
+        }
+        if (PyUnicode_READY(prefix) < 0) {
+            goto done;
+        }
+        n = PyUnicode_GET_LENGTH(prefix);
+        if (name_len <= n) {
+            continue;
+        }
+        if (is_ascii) {
+            matched = ascii_startswith_nocase(PyUnicode_1BYTE_DATA(name), prefix);
+        } else {
+            PyObject *prefix_upper = PyObject_CallMethod(prefix, "upper", NULL);
+            Py_ssize_t tail_match;
+            if (prefix_upper == NULL) {
+                goto done;
+            }
+            tail_match = PyUnicode_Tailmatch(
+                name_upper, prefix_upper, 0, PY_SSIZE_T_MAX, -1);
+            Py_DECREF(prefix_upper);
+            if (tail_match == -1) {
+                goto done;
+            }
+            matched = (int) tail_match;
+        }
+        if (matched) {
+            PyObject *tail = PyUnicode_Substring(name, n, name_len);
+            if (tail == NULL) {
+                goto done;
+            }
+            rest = PyObject_CallMethod(tail, "strip", "O", seps);
+            Py_DECREF(tail);
+            if (rest == NULL) {
+                goto done;
+            }
+            species = prefix;
+            break;
+        }
+    }
+    if (rest == NULL) {
+        Py_INCREF(name);
+        rest = name;
+    }
+    result = PyTuple_Pack(2, species, rest);
+
+done:
+    Py_XDECREF(rest);
+    Py_XDECREF(name_upper);
+    Py_DECREF(prefix_seq);
+    return result;
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"parse_separator", (PyCFunction) parse_separator,
+     METH_VARARGS | METH_KEYWORDS, NULL},
+    {"parse_alphanum", (PyCFunction) parse_alphanum,
+     METH_VARARGS | METH_KEYWORDS, NULL},
+    {"parse_letters", (PyCFunction) parse_letters,
+     METH_VARARGS | METH_KEYWORDS, NULL},
+    {"parse_numbers", (PyCFunction) parse_numbers,
+     METH_VARARGS | METH_KEYWORDS, NULL},
+    {"parse_not_numbers", (PyCFunction) parse_not_numbers,
+     METH_VARARGS | METH_KEYWORDS, NULL},
+    {"parse_until", parse_until, METH_VARARGS, NULL},
+    {"split_prefix", split_prefix, METH_VARARGS,
+     "split_prefix(name, prefixes, seps) -> (prefix or None, rest)"},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "mhcnames._speedups",
+    "Compiled versions of the mhcnames parsing helpers",
+    -1,
+    speedups_methods
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    return PyModule_Create(&speedups_module);
+}
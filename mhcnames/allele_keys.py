@@ -0,0 +1,272 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Packs parsed alleles into non-negative 64-bit integers, so that large
+tables of alleles can be sorted, grouped and joined as int64 arrays.
+
+From the most to the least significant bit, a key holds:
+    - 7 bits for the species prefix (its position among all prefixes in
+      species.py, sorted case-insensitively, plus one)
+    - 30 bits for the gene name, up to 5 alphanumeric characters
+    - 13 bits for the allele family
+    - 13 bits for the allele code
+
+Families and codes are stored as their number when they're written the
+way parse_allele_name normalizes them (e.g. "02", "120"), or otherwise as
+up to 2 letters or digits (e.g. the mouse allele code "b"). Numbers sort
+before letters, so sorting keys gives the natural order by species, gene,
+family and then allele code. Keys are deterministic for a given version
+of mhcnames; adding species prefixes can change them between versions.
+
+The key 0 never encodes an allele and is used for a missing chain.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from six import string_types
+
+from .allele_name import AlleleName
+from .allele_parse_error import AlleleParseError
+from .class2 import parse_classi_or_classii_allele_name
+from .species import _all_prefixes
+
+NO_ALLELE_KEY = 0
+
+# Alleles can be compared at three resolutions, e.g. for HLA-A*02:01:
+#   - "gene": HLA-A
+#   - "family": HLA-A*02
+#   - "allele": HLA-A*02:01
+RESOLUTIONS = ("gene", "family", "allele")
+
+SPECIES_BITS = 7
+GENE_BITS = 30
+FAMILY_BITS = 13
+CODE_BITS = 13
+
+CODE_SHIFT = 0
+FAMILY_SHIFT = CODE_SHIFT + CODE_BITS
+GENE_SHIFT = FAMILY_SHIFT + FAMILY_BITS
+SPECIES_SHIFT = GENE_SHIFT + GENE_BITS
+
+# characters allowed in genes and non-numeric families/codes, in ASCII
+# order; each is stored as its position plus one, with zero as padding
+_ALPHABET = (
+    "0123456789"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "abcdefghijklmnopqrstuvwxyz")
+_CHAR_BITS = 6
+_MAX_GENE_LENGTH = GENE_BITS // _CHAR_BITS
+_char_codes = {c: i + 1 for (i, c) in enumerate(_ALPHABET)}
+
+# numbers from 0 up to this limit are stored as their value plus one,
+# two character strings take the codes above that
+_MAX_NUMBER = 4095
+_FIRST_STRING_CODE = _MAX_NUMBER + 2
+
+_sorted_prefixes = sorted(_all_prefixes, key=lambda prefix: prefix.upper())
+_species_codes = {
+    prefix: i + 1 for (i, prefix) in enumerate(_sorted_prefixes)}
+
+assert len(_sorted_prefixes) < 2 ** SPECIES_BITS
+assert _FIRST_STRING_CODE + (len(_ALPHABET) + 1) ** 2 < 2 ** FAMILY_BITS
+
+
+def _encode_chars(s, max_length, field, allele):
+    if len(s) > max_length:
+        raise ValueError(
+            "Can't encode %s '%s' of %s, longer than %d characters" % (
+                field, s, allele, max_length))
+    value = 0
+    for i in range(max_length):
+        value <<= _CHAR_BITS
+        if i < len(s):
+            code = _char_codes.get(s[i])
+            if code is None:
+                raise ValueError(
+                    "Can't encode character '%s' in %s of %s" % (
+                        s[i], field, allele))
+            value |= code
+    return value
+
+
+def _decode_chars(value, max_length):
+    chars = []
+    for i in range(max_length - 1, -1, -1):
+        code = (value >> (i * _CHAR_BITS)) & ((1 << _CHAR_BITS) - 1)
+        if code:
+            chars.append(_ALPHABET[code - 1])
+    return "".join(chars)
+
+
+def _format_number(value):
+    return "%02d" % value
+
+
+def _encode_field(s, field, allele):
+    if len(s) == 0:
+        return 0
+    if s.isdigit() and int(s) <= _MAX_NUMBER and _format_number(int(s)) == s:
+        return int(s) + 1
+    return _FIRST_STRING_CODE + _encode_chars(s, 2, field, allele)
+
+
+def _decode_field(value):
+    if value == 0:
+        return ""
+    elif value < _FIRST_STRING_CODE:
+        return _format_number(value - 1)
+    else:
+        return _decode_chars(value - _FIRST_STRING_CODE, 2)
+
+
+def encode_allele(allele):
+    """
+    Packs an AlleleName into a 64-bit integer key.
+
+    Raises a ValueError for alleles whose fields don't fit, such as swine
+    families like "w09pt".
+    """
+    species_code = _species_codes.get(allele.species)
+    if species_code is None:
+        raise ValueError("Can't encode unknown species '%s' of %s" % (
+            allele.species, allele))
+    return (
+        (species_code << SPECIES_SHIFT) |
+        (_encode_chars(allele.gene, _MAX_GENE_LENGTH, "gene", allele)
+            << GENE_SHIFT) |
+        (_encode_field(allele.allele_family, "family", allele)
+            << FAMILY_SHIFT) |
+        (_encode_field(allele.allele_code, "allele code", allele)
+            << CODE_SHIFT))
+
+
+def decode_allele(key):
+    """
+    Unpacks a key made by encode_allele into an AlleleName.
+    """
+    key = int(key)
+    species_code = key >> SPECIES_SHIFT
+    if key < 0 or not (0 < species_code <= len(_sorted_prefixes)):
+        raise ValueError("Invalid allele key: %d" % key)
+    return AlleleName(
+        _sorted_prefixes[species_code - 1],
+        _decode_chars(
+            (key >> GENE_SHIFT) & ((1 << GENE_BITS) - 1), _MAX_GENE_LENGTH),
+        _decode_field((key >> FAMILY_SHIFT) & ((1 << FAMILY_BITS) - 1)),
+        _decode_field((key >> CODE_SHIFT) & ((1 << CODE_BITS) - 1)))
+
+
+def encode_allele_name(name, infer_pair=True):
+    """
+    Parses a class I or class II allele name and returns a tuple with the
+    key of each chain, e.g. two keys for an alpha/beta pair.
+    """
+    return tuple(
+        encode_allele(allele)
+        for allele in parse_classi_or_classii_allele_name(
+            name, infer_pair=infer_pair))
+
+
+_resolution_masks = {
+    "gene": ~((1 << GENE_SHIFT) - 1),
+    "family": ~((1 << FAMILY_SHIFT) - 1),
+    "allele": ~0,
+}
+
+
+def _require_numpy():
+    # imported here so that importing mhcnames doesn't load numpy
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "numpy is required for vectorized allele keys, "
+            "install it with 'pip install numpy'")
+    return numpy
+
+
+def encode(names, infer_pair=True, raise_on_error=True):
+    """
+    Encodes a sequence of allele names into an int64 array with two columns.
+
+    Alpha/beta pairs fill both columns; alleles with a single chain are
+    placed in the first column with NO_ALLELE_KEY in the second. Each
+    distinct name is only parsed once, using a dictionary so the work grows
+    linearly with the number of names.
+
+    Names which can't be parsed or encoded (e.g. swine alleles such as
+    "SLA-2*07we01") raise an AlleleParseError or ValueError, or get
+    NO_ALLELE_KEY in both columns if raise_on_error is False, as do
+    missing values such as None or NaN.
+    """
+    np = _require_numpy()
+    # row of each distinct name in unique_keys
+    rows = {}
+    unique_keys = []
+    indices = np.empty(len(names), dtype=np.intp)
+    missing_row = None
+    for i, name in enumerate(names):
+        if not isinstance(name, string_types):
+            if raise_on_error:
+                raise ValueError("Expected allele name but got %r" % (name,))
+            if missing_row is None:
+                missing_row = len(unique_keys)
+                unique_keys.append((NO_ALLELE_KEY, NO_ALLELE_KEY))
+            indices[i] = missing_row
+            continue
+        row = rows.get(name)
+        if row is None:
+            try:
+                keys = encode_allele_name(name, infer_pair=infer_pair)
+            except (AlleleParseError, ValueError):
+                if raise_on_error:
+                    raise
+                keys = ()
+            row = rows[name] = len(unique_keys)
+            unique_keys.append(
+                tuple(keys) + (NO_ALLELE_KEY,) * (2 - len(keys)))
+        indices[i] = row
+    unique_keys = np.array(unique_keys, dtype=np.int64).reshape((-1, 2))
+    return unique_keys[indices]
+
+
+def decode(keys):
+    """
+    Decodes an array of keys (of any shape) into an object array of the
+    same shape holding AlleleName objects, with None for NO_ALLELE_KEY.
+    """
+    np = _require_numpy()
+    keys = np.asarray(keys, dtype=np.int64)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    unique_alleles = np.empty(len(unique_keys), dtype=object)
+    for i, key in enumerate(unique_keys):
+        if key != NO_ALLELE_KEY:
+            unique_alleles[i] = decode_allele(key)
+    return unique_alleles[inverse.reshape(-1)].reshape(keys.shape)
+
+
+def truncate(keys, resolution):
+    """
+    Clears the allele code bits ("family" resolution) or both the family
+    and allele code bits ("gene" resolution) of an array of keys, so that
+    keys can be grouped by e.g. "HLA-A*02" or "HLA-A".
+    """
+    np = _require_numpy()
+    if resolution not in _resolution_masks:
+        raise ValueError(
+            "Invalid resolution '%s', must be one of: %s" % (
+                resolution, ", ".join(RESOLUTIONS)))
+    return np.asarray(keys, dtype=np.int64) & np.int64(
+        _resolution_masks[resolution])
@@ -17,6 +17,7 @@ from __future__ import print_function, division, absolute_import
 from collections import namedtuple
 
 from .parsing_helpers import (
+    check_allele_name_length,
     parse_separator,
     parse_alphanum,
     parse_numbers,
@@ -58,7 +59,10 @@ def parse_allele_name(name, species_prefix=None):
 
     The logic for other species mostly resembles the naming system for humans,
     except for mice, rats, and swine, which have archaic nomenclature.
+
+    Names longer than MAX_ALLELE_NAME_LENGTH raise an AlleleParseError.
     """
+    check_allele_name_length(name)
     original = name
     name = name.strip()
 
@@ -0,0 +1,212 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function, division, absolute_import
+
+from six import string_types
+
+from .allele_keys import encode_allele, RESOLUTIONS, _resolution_masks
+from .allele_name import AlleleName
+from .allele_parse_error import AlleleParseError
+from .class2 import parse_classi_or_classii_allele_name
+
+_resolution_lengths = {
+    "gene": 2,
+    "family": 3,
+    "allele": 4,
+}
+
+_parsed_chains_cache = {}
+
+
+def _allele_key(allele, resolution):
+    """
+    Key of an allele at a resolution, which compares the same way in every
+    process: its 64-bit key from encode_allele with the finer fields
+    cleared, or the tuple of its fields if it can't be encoded.
+    """
+    if resolution == "family" and not allele.allele_family:
+        # alleles without families (e.g. mouse H-2-Kd) only match at the
+        # allele level, otherwise every H-2-K allele would be one family
+        resolution = "allele"
+    try:
+        return encode_allele(allele) & _resolution_masks[resolution]
+    except ValueError:
+        return tuple(allele[:_resolution_lengths[resolution]])
+
+
+def _check_resolution(resolution):
+    if resolution not in _resolution_lengths:
+        raise ValueError(
+            "Invalid resolution '%s', must be one of: %s" % (
+                resolution, ", ".join(RESOLUTIONS)))
+
+
+def parse_allele_chains(name):
+    """
+    Parses an allele name into a tuple of AlleleName objects, one for each
+    chain actually named: alpha/beta pairs give two chains but no alpha
+    chain is inferred for a lone beta chain.
+    """
+    if isinstance(name, AlleleName):
+        return (name,)
+    if name not in _parsed_chains_cache:
+        _parsed_chains_cache[name] = parse_classi_or_classii_allele_name(
+            name, infer_pair=False)
+    return _parsed_chains_cache[name]
+
+
+class AlleleSet(object):
+    """
+    Immutable set of parsed alleles which can be compared with other sets at
+    the gene, family or full allele resolution.
+
+    Alleles may be given as names or AlleleName objects; both chains of an
+    alpha/beta pair are added as separate alleles.
+    """
+    def __init__(self, alleles=()):
+        chains = set()
+        for allele in alleles:
+            chains.update(parse_allele_chains(allele))
+        self.alleles = frozenset(chains)
+        self._keys = {}
+
+    def keys(self, resolution="allele"):
+        """
+        Returns the frozenset of keys of these alleles at the given
+        resolution, which are mostly 64-bit integers from encode_allele
+        with the finer fields cleared.
+        """
+        keys = self._keys.get(resolution)
+        if keys is None:
+            _check_resolution(resolution)
+            keys = frozenset(
+                _allele_key(allele, resolution) for allele in self.alleles)
+            self._keys[resolution] = keys
+        return keys
+
+    def _filter(self, other, resolution, keep_matches):
+        other_keys = _as_allele_set(other).keys(resolution)
+        return AlleleSet(
+            allele for allele in self.alleles
+            if (_allele_key(allele, resolution) in other_keys) == keep_matches)
+
+    def intersection(self, other, resolution="allele"):
+        """
+        Alleles of this set which match some allele of the other set at the
+        given resolution.
+        """
+        return self._filter(other, resolution, keep_matches=True)
+
+    def difference(self, other, resolution="allele"):
+        """
+        Alleles of this set which don't match any allele of the other set at
+        the given resolution.
+        """
+        return self._filter(other, resolution, keep_matches=False)
+
+    def union(self, other):
+        return AlleleSet(self.alleles | _as_allele_set(other).alleles)
+
+    def count_matches(self, other, resolution="allele"):
+        """
+        Number of distinct genes, families or alleles (depending on the
+        resolution) shared with another set.
+        """
+        return len(self.keys(resolution) & _as_allele_set(other).keys(resolution))
+
+    def matches(self, other, resolution="allele"):
+        return not self.keys(resolution).isdisjoint(
+            _as_allele_set(other).keys(resolution))
+
+    def __getstate__(self):
+        # keys are cheap to rebuild, so only the alleles are pickled
+        return {"alleles": self.alleles}
+
+    def __setstate__(self, state):
+        self.alleles = state["alleles"]
+        self._keys = {}
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __contains__(self, allele):
+        if not isinstance(allele, (AlleleName,) + tuple(string_types)):
+            return False
+        try:
+            chains = parse_allele_chains(allele)
+        except (AlleleParseError, ValueError):
+            return False
+        return all(chain in self.alleles for chain in chains)
+
+    def __iter__(self):
+        return iter(sorted(self.alleles))
+
+    def __len__(self):
+        return len(self.alleles)
+
+    def __eq__(self, other):
+        return isinstance(other, AlleleSet) and self.alleles == other.alleles
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash(self.alleles)
+
+    def __repr__(self):
+        return "AlleleSet([%s])" % ", ".join(
+            repr(allele) for allele in self)
+
+
+def _as_allele_set(alleles):
+    if isinstance(alleles, AlleleSet):
+        return alleles
+    if isinstance(alleles, string_types):
+        alleles = [alleles]
+    return AlleleSet(alleles)
+
+
+def pairwise_match_counts(allele_sets_a, allele_sets_b, resolution="allele"):
+    """
+    Counts the matching genes, families or alleles between every set in
+    allele_sets_a and every set in allele_sets_b (e.g. all donors against
+    all recipients). Returns a list of N rows, each a list of M counts.
+
+    Uses an inverted index from keys to the sets in allele_sets_b containing
+    them, so the work beyond allocating the result grows with the number of
+    matches rather than with N * M set intersections.
+    """
+    _check_resolution(resolution)
+    keys_a = [_as_allele_set(s).keys(resolution) for s in allele_sets_a]
+    keys_b = [_as_allele_set(s).keys(resolution) for s in allele_sets_b]
+    index = {}
+    for j, keys in enumerate(keys_b):
+        for key in keys:
+            index.setdefault(key, []).append(j)
+    n_cols = len(keys_b)
+    result = []
+    for keys in keys_a:
+        row = [0] * n_cols
+        for key in keys:
+            for j in index.get(key, ()):
+                row[j] += 1
+        result.append(row)
+    return result
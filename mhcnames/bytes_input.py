@@ -0,0 +1,212 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parsing allele names which are still raw bytes, e.g. fields sliced out of
+a memory-mapped file. Results are kept in bounded caches keyed by the bytes
+of each name, which are checked before anything is copied or decoded, and
+on Python 3 the returned strings are interned.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import mmap
+
+from .allele_name import parse_allele_name, AlleleName
+from .allele_parse_error import AlleleParseError
+from .normalization import normalize_allele_name, compact_allele_name
+from .normalizer import BoundedCache
+from .parsing_helpers import check_allele_name_length, MAX_ALLELE_NAME_LENGTH
+
+if str is bytes:
+    # Python 2 can't intern the unicode strings returned by decode
+    def _intern(s):
+        return s
+else:
+    from sys import intern as _intern
+
+# most recently used results, keyed by the bytes of each name
+_parsed_bytes_cache = BoundedCache(100000)
+_normalized_bytes_cache = BoundedCache(100000)
+_compact_bytes_cache = BoundedCache(100000)
+
+# stands in for the result of a field which can't be parsed
+_INVALID = object()
+
+
+def _memo_key(raw_allele):
+    """
+    Returns raw_allele itself if it can be used to look up a dictionary
+    key made of bytes, which holds for bytes and (on Python 3) read-only
+    memoryviews, or else a copy of it as bytes.
+    """
+    check_allele_name_length(raw_allele)
+    if isinstance(raw_allele, bytes):
+        return raw_allele
+    if isinstance(raw_allele, memoryview) and str is not bytes:
+        try:
+            hash(raw_allele)
+            return raw_allele
+        except (TypeError, ValueError):
+            # memoryviews of writable buffers can't be hashed
+            pass
+    return _to_bytes(raw_allele)
+
+
+def _to_bytes(raw_allele):
+    if isinstance(raw_allele, bytes):
+        return raw_allele
+    if isinstance(raw_allele, memoryview):
+        # bytes(memoryview) is its repr on Python 2
+        return raw_allele.tobytes()
+    return bytes(raw_allele)
+
+
+def _decode(raw_allele):
+    try:
+        return raw_allele.decode("utf-8")
+    except UnicodeDecodeError:
+        raise AlleleParseError("Can't decode allele name: %r" % (raw_allele,))
+
+
+def parse_allele_name_bytes(raw_allele, species_prefix=None):
+    """
+    Same as parse_allele_name but takes bytes, bytearray or memoryview,
+    returning an AlleleName whose fields are interned on Python 3.
+    """
+    key = _memo_key(raw_allele)
+    parsed = _parsed_bytes_cache.get((key, species_prefix))
+    if parsed is None:
+        raw_allele = _to_bytes(key)
+        parsed = parse_allele_name(_decode(raw_allele), species_prefix)
+        parsed = AlleleName(*[_intern(field) for field in parsed])
+        _parsed_bytes_cache[(raw_allele, species_prefix)] = parsed
+    return parsed
+
+
+def normalize_allele_name_bytes(
+        raw_allele, omit_dra1=False, infer_class2_pair=True):
+    """
+    Same as normalize_allele_name but takes bytes, bytearray or memoryview
+    and returns a string which is interned on Python 3.
+    """
+    key = _memo_key(raw_allele)
+    normalized = _normalized_bytes_cache.get((key, omit_dra1, infer_class2_pair))
+    if normalized is None:
+        raw_allele = _to_bytes(key)
+        normalized = _intern(normalize_allele_name(
+            _decode(raw_allele),
+            omit_dra1=omit_dra1,
+            infer_class2_pair=infer_class2_pair))
+        _normalized_bytes_cache[(raw_allele, omit_dra1, infer_class2_pair)] = (
+            normalized)
+    return normalized
+
+
+def compact_allele_name_bytes(raw_allele):
+    """
+    Same as compact_allele_name but takes bytes, bytearray or memoryview
+    and returns a string which is interned on Python 3.
+    """
+    key = _memo_key(raw_allele)
+    compact = _compact_bytes_cache.get(key)
+    if compact is None:
+        raw_allele = _to_bytes(key)
+        compact = _intern(compact_allele_name(_decode(raw_allele)))
+        _compact_bytes_cache[raw_allele] = compact
+    return compact
+
+
+# bytes of the file split into lines at a time by
+# iter_normalized_alleles_in_file
+_CHUNK_SIZE = 1 << 20
+
+
+def iter_normalized_alleles_in_file(
+        path,
+        column=0,
+        sep=b"\t",
+        comment=b"#",
+        omit_dra1=False,
+        infer_class2_pair=True,
+        raise_on_error=True):
+    """
+    Memory-maps a delimited text file and yields the normalized allele name
+    in the given (zero-based) column of every line, skipping blank lines and
+    lines starting with `comment` (such as VCF headers).
+
+    The file is split into lines a megabyte at a time and lines are only
+    ever split as bytes, so nothing is decoded except the first occurrence
+    of each distinct allele field, which is parsed once (including fields
+    which can't be parsed). Lines with too few columns or unparseable
+    alleles raise an AlleleParseError, or yield None if raise_on_error
+    is False.
+    """
+    # memo local to this file, keyed only by the bytes of the allele field
+    normalized_fields = {}
+    get_normalized = normalized_fields.get
+    max_split = column + 1
+
+    def normalize_field(field):
+        try:
+            normalized = normalize_allele_name_bytes(
+                field.rstrip(b"\r"),
+                omit_dra1=omit_dra1,
+                infer_class2_pair=infer_class2_pair)
+        except (AlleleParseError, ValueError):
+            if raise_on_error:
+                raise
+            normalized = _INVALID
+        if len(field) <= MAX_ALLELE_NAME_LENGTH:
+            normalized_fields[field] = normalized
+        return normalized
+
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # can't memory-map an empty file
+            return
+        try:
+            start = 0
+            while start < len(mm):
+                # chunks end just after a newline so no line is split
+                end = mm.find(b"\n", start + _CHUNK_SIZE)
+                end = len(mm) if end < 0 else end + 1
+                for line in mm[start:end].split(b"\n"):
+                    fields = line.split(sep, max_split)
+                    if len(fields) > column and not (
+                            comment and line.startswith(comment)):
+                        field = fields[column]
+                        normalized = get_normalized(field)
+                        if normalized is None:
+                            if max_split == 1 and not field.rstrip(b"\r"):
+                                # blank line
+                                continue
+                            normalized = normalize_field(field)
+                    elif not line.rstrip(b"\r") or (
+                            comment and line.startswith(comment)):
+                        continue
+                    elif raise_on_error:
+                        raise AlleleParseError(
+                            "Missing column %d in %s" % (column, path))
+                    else:
+                        normalized = _INVALID
+                    if normalized is _INVALID:
+                        yield None
+                    else:
+                        yield normalized
+                start = end
+        finally:
+            mm.close()
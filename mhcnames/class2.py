@@ -17,6 +17,7 @@ from __future__ import print_function, division, absolute_import
 from .species import split_species_prefix
 from .allele_name import parse_allele_name, AlleleName
 from .allele_parse_error import AlleleParseError
+from .parsing_helpers import check_allele_name_length
 
 def infer_alpha_chain(beta):
     """
@@ -56,6 +57,7 @@ def parse_classi_or_classii_allele_name(name, infer_pair=True):
     DRB101:02
     HLA-DRB1_0102
     """
+    check_allele_name_length(name)
     species, name = split_species_prefix(name)
 
     # Handle the case where alpha/beta pairs are separated with a /.
@@ -0,0 +1,164 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Command line interface, e.g.:
+
+    mhcnames warm-cache --cache alleles.sqlite alleles.txt
+    mhcnames summarize alleles.txt
+    mhcnames generate -n 1000000 --seed 1 > synthetic.tsv
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import argparse
+import sys
+
+from .corpus_summary import summarize_alleles
+from .persistent_cache import PersistentCache, warm_persistent_cache
+from .synthetic import generate_allele_names
+
+
+def iter_lines(paths):
+    """
+    Yields stripped non-empty lines from each file, where "-" means stdin.
+    """
+    for path in paths:
+        if path == "-":
+            f = sys.stdin
+        else:
+            f = open(path)
+        try:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def run_warm_cache(args):
+    cache = PersistentCache(args.cache)
+    try:
+        n_cached, n_skipped = warm_persistent_cache(
+            cache,
+            iter_lines(args.input),
+            omit_dra1=args.omit_dra1,
+            infer_class2_pair=not args.no_infer_class2_pair)
+    finally:
+        cache.close()
+    print("Cached %d allele names in %s (skipped %d unparseable)" % (
+        n_cached, args.cache, n_skipped))
+
+
+def run_summarize(args):
+    summary = summarize_alleles(iter_lines(args.input))
+    print("alleles\t%d" % summary.n_alleles)
+    print("distinct\t%d" % summary.n_distinct)
+    print("unparseable\t%d" % summary.unparseable_count)
+    for title, counts in [
+            ("class", summary.class_counts),
+            ("species", summary.species_counts),
+            ("gene", summary.gene_counts)]:
+        print()
+        print(title)
+        for key, count in counts.most_common():
+            print("%s\t%d" % (key, count))
+
+
+def run_generate(args):
+    for name, expected in generate_allele_names(
+            args.n,
+            seed=args.seed,
+            malformed_fraction=args.malformed_fraction,
+            extended_resolution=args.extended_resolution):
+        print("%s\t%s" % (name, expected if expected is not None else ""))
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(
+        prog="mhcnames",
+        description="Tools for parsing and normalizing MHC allele names")
+    subparsers = parser.add_subparsers(dest="command")
+
+    warm_cache = subparsers.add_parser(
+        "warm-cache",
+        help="Fill a persistent normalization cache from files of allele names")
+    warm_cache.add_argument(
+        "--cache",
+        required=True,
+        help="Path of the SQLite cache file")
+    warm_cache.add_argument(
+        "--omit-dra1",
+        action="store_true",
+        default=False)
+    warm_cache.add_argument(
+        "--no-infer-class2-pair",
+        action="store_true",
+        default=False)
+    warm_cache.add_argument(
+        "input",
+        nargs="+",
+        help="Files with one allele name per line ('-' for stdin)")
+    warm_cache.set_defaults(func=run_warm_cache)
+
+    summarize = subparsers.add_parser(
+        "summarize",
+        help="Count allele names by MHC class, species and gene")
+    summarize.add_argument(
+        "input",
+        nargs="+",
+        help="Files with one allele name per line ('-' for stdin)")
+    summarize.set_defaults(func=run_summarize)
+
+    generate = subparsers.add_parser(
+        "generate",
+        help=(
+            "Print synthetic allele names and their expected normalizations "
+            "(empty for malformed names) separated by a tab"))
+    generate.add_argument(
+        "-n",
+        type=int,
+        default=1000,
+        help="Number of names to generate")
+    generate.add_argument(
+        "--seed",
+        type=int,
+        default=0)
+    generate.add_argument(
+        "--malformed-fraction",
+        type=float,
+        default=0.05)
+    generate.add_argument(
+        "--extended-resolution",
+        action="store_true",
+        default=False,
+        help="Include 3 and 4 field names and expression suffixes")
+    generate.set_defaults(func=run_generate)
+    return parser
+
+
+def main(args_list=None):
+    parser = make_parser()
+    args = parser.parse_args(args_list)
+    if getattr(args, "func", None) is None:
+        parser.print_help()
+        return 1
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function, division, absolute_import
+
+from collections import namedtuple, Counter
+
+from six import string_types
+
+from .allele_parse_error import AlleleParseError
+from .class2 import parse_classi_or_classii_allele_name
+
+CorpusSummary = namedtuple("CorpusSummary", [
+    # total number of allele names seen
+    "n_alleles",
+    # number of distinct raw spellings
+    "n_distinct",
+    # species prefix -> count, e.g. "HLA"
+    "species_counts",
+    # species and gene -> count, e.g. "HLA-A", counting both chains of
+    # alpha/beta pairs
+    "gene_counts",
+    # "I" or "II" -> count
+    "class_counts",
+    # the same keys as above mapped to lists of positions in the input
+    "species_indices",
+    "gene_indices",
+    "class_indices",
+    "unparseable_count",
+    "unparseable_indices",
+])
+
+
+def mhc_class(parsed_alleles):
+    """
+    Returns "I" or "II" for the tuple of AlleleName objects returned by
+    parse_classi_or_classii_allele_name.
+    """
+    if len(parsed_alleles) > 1:
+        return "II"
+    allele = parsed_alleles[0]
+    if allele.species == "H-2":
+        # mouse class II genes are IA and IE, also spelled as their
+        # chains, e.g. H-2-Ea or H-2-Ab, while class I genes are K, D, L,
+        # Q, T and M
+        if allele.gene[:1] in ("I", "E", "A"):
+            return "II"
+    elif allele.gene.startswith("D"):
+        return "II"
+    return "I"
+
+
+def _profile_allele_name(name):
+    """
+    Returns the species, the gene of each chain and the class of an allele
+    name, or None if it can't be parsed.
+    """
+    try:
+        parsed_alleles = parse_classi_or_classii_allele_name(
+            name, infer_pair=False)
+    except (AlleleParseError, ValueError):
+        return None
+    genes = tuple(
+        "%s-%s" % (allele.species, allele.gene) for allele in parsed_alleles)
+    return (parsed_alleles[0].species, genes, mhc_class(parsed_alleles))
+
+
+def summarize_alleles(names):
+    """
+    Counts and partitions allele names by species, gene and MHC class in
+    one pass over any iterable. Each distinct spelling is parsed only once,
+    so the cost grows with the number of distinct names rather than rows.
+    No alpha chain is inferred for lone class II beta chains, and missing
+    values such as None or NaN are counted as unparseable.
+    """
+    profiles = {}
+    species_indices = {}
+    gene_indices = {}
+    class_indices = {}
+    unparseable_indices = []
+    n_alleles = 0
+    for i, name in enumerate(names):
+        n_alleles += 1
+        if not isinstance(name, string_types):
+            unparseable_indices.append(i)
+            continue
+        if name in profiles:
+            profile = profiles[name]
+        else:
+            profile = profiles[name] = _profile_allele_name(name)
+        if profile is None:
+            unparseable_indices.append(i)
+            continue
+        species, genes, allele_class = profile
+        species_indices.setdefault(species, []).append(i)
+        for gene in genes:
+            gene_indices.setdefault(gene, []).append(i)
+        class_indices.setdefault(allele_class, []).append(i)
+
+    def counts(indices):
+        return Counter({key: len(value) for (key, value) in indices.items()})
+
+    return CorpusSummary(
+        n_alleles=n_alleles,
+        n_distinct=len(profiles),
+        species_counts=counts(species_indices),
+        gene_counts=counts(gene_indices),
+        class_counts=counts(class_indices),
+        species_indices=species_indices,
+        gene_indices=gene_indices,
+        class_indices=class_indices,
+        unparseable_count=len(unparseable_indices),
+        unparseable_indices=unparseable_indices)
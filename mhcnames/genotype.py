@@ -0,0 +1,144 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parsing of whole typing records such as:
+
+    A*02:01/A*03:01, B*07:02 B*08:01, DRB1*15:01
+    A2 A3 B7 B8
+    HLA-A*02:01+HLA-A*24:02
+
+Alleles are separated by whitespace, commas, semicolons or "+", while "/"
+(optionally surrounded by spaces) separates the alternatives of an
+ambiguous typing. Alternatives may leave out the gene, as in
+"A*02:01/03:01".
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import namedtuple, OrderedDict
+import re
+
+from .allele_name import parse_allele_name
+from .allele_parse_error import AlleleParseError
+
+# Longest typing record we'll try to parse, see MAX_ALLELE_NAME_LENGTH
+MAX_GENOTYPE_LENGTH = 4096
+
+_token_regex = re.compile(r"[^\s,;+]+")
+_spaced_slash_regex = re.compile(r"\s*/\s*")
+
+LocusGenotype = namedtuple("LocusGenotype", [
+    "species",
+    "gene",
+    # tuple with one entry per typed allele, each of which is a tuple of
+    # AlleleName alternatives (more than one when the typing is ambiguous)
+    "alleles",
+    # True when all the typings at this locus are the same, including
+    # when only one allele was reported
+    "homozygous",
+    # True when any typing at this locus lists several alternatives
+    "ambiguous",
+])
+
+
+class Genotype(namedtuple("Genotype", ["loci"])):
+    """
+    Parsed typing record, holding a tuple of LocusGenotype objects in order
+    of first appearance.
+    """
+    def locus(self, gene, species="HLA"):
+        """
+        Returns the LocusGenotype of the given gene, or None if it wasn't typed.
+        """
+        for locus in self.loci:
+            if locus.gene == gene and locus.species == species:
+                return locus
+        return None
+
+
+def _parse_typing(token, allele_cache):
+    """
+    Parses one token (e.g. "A*02:01/03:01") into a tuple of AlleleName
+    alternatives which all belong to the same locus.
+    """
+    alternatives = []
+    for part in token.split("/"):
+        if len(part) == 0:
+            raise AlleleParseError("Empty alternative in '%s'" % token)
+        if alternatives and part[0].isdigit():
+            # abbreviated alternative such as the "03:01" in "A*02:01/03:01"
+            first = alternatives[0]
+            part = "%s-%s*%s" % (first.species, first.gene, part)
+        allele = allele_cache.get(part)
+        if allele is None:
+            allele = allele_cache[part] = parse_allele_name(part)
+        if alternatives and (
+                (allele.species, allele.gene) !=
+                (alternatives[0].species, alternatives[0].gene)):
+            raise AlleleParseError(
+                "Alternatives of '%s' belong to different loci" % token)
+        if allele not in alternatives:
+            alternatives.append(allele)
+    return tuple(alternatives)
+
+
+def parse_genotype(record, max_alleles_per_locus=2):
+    """
+    Parses a typing record listing several alleles (see module docstring)
+    into a Genotype, grouping the alleles by locus.
+
+    The record is tokenized in a single scan and raises an AlleleParseError
+    for any allele which can't be parsed, for records longer than
+    MAX_GENOTYPE_LENGTH, or for loci with more than max_alleles_per_locus
+    typings (pass None to allow any number, e.g. for duplicated genes).
+    """
+    return _parse_genotype(record, {}, max_alleles_per_locus)
+
+
+def _parse_genotype(record, allele_cache, max_alleles_per_locus):
+    if len(record) > MAX_GENOTYPE_LENGTH:
+        raise AlleleParseError(
+            "Genotype of length %d exceeds maximum of %d characters" % (
+                len(record), MAX_GENOTYPE_LENGTH))
+    typings_by_locus = OrderedDict()
+    for match in _token_regex.finditer(_spaced_slash_regex.sub("/", record)):
+        typing = _parse_typing(match.group(0), allele_cache)
+        locus = (typing[0].species, typing[0].gene)
+        typings = typings_by_locus.setdefault(locus, [])
+        typings.append(typing)
+        if max_alleles_per_locus is not None and (
+                len(typings) > max_alleles_per_locus):
+            raise AlleleParseError(
+                "More than %d alleles of %s-%s in '%s'" % (
+                    max_alleles_per_locus, locus[0], locus[1], record))
+    loci = []
+    for (species, gene), typings in typings_by_locus.items():
+        loci.append(LocusGenotype(
+            species=species,
+            gene=gene,
+            alleles=tuple(typings),
+            homozygous=all(typing == typings[0] for typing in typings),
+            ambiguous=any(len(typing) > 1 for typing in typings)))
+    return Genotype(tuple(loci))
+
+
+def parse_genotypes(records, max_alleles_per_locus=2):
+    """
+    Lazily parses an iterable of typing records, sharing one cache of parsed
+    allele spellings across all of them.
+    """
+    allele_cache = {}
+    for record in records:
+        yield _parse_genotype(record, allele_cache, max_alleles_per_locus)
@@ -0,0 +1,88 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function, division, absolute_import
+
+from collections import namedtuple, OrderedDict
+
+from .normalization import normalize_allele_name
+
+AlleleGroup = namedtuple("AlleleGroup", [
+    # positions of this allele's rows in the original sequences
+    "indices",
+    # peptides of those rows, in the same order
+    "peptides",
+])
+
+
+def group_peptides_by_allele(
+        peptides,
+        alleles,
+        omit_dra1=False,
+        infer_class2_pair=True):
+    """
+    Groups parallel sequences of peptides and raw allele names by normalized
+    allele, so that a predictor can be called once per allele.
+
+    Returns an OrderedDict from each normalized allele name (in order of
+    first appearance) to an AlleleGroup. Each distinct raw spelling is
+    normalized once and the options are passed to normalize_allele_name, so
+    e.g. with omit_dra1=True both "DRB1*01:01" and "DRA1*01:01-DRB1*01:01"
+    end up in the "HLA-DRB1*01:01" group.
+    """
+    if len(peptides) != len(alleles):
+        raise ValueError(
+            "Expected the same number of peptides and alleles, got %d and %d" % (
+                len(peptides), len(alleles)))
+    normalized_names = {}
+    groups = OrderedDict()
+    for i, (peptide, raw_allele) in enumerate(zip(peptides, alleles)):
+        normalized = normalized_names.get(raw_allele)
+        if normalized is None:
+            normalized = normalize_allele_name(
+                raw_allele,
+                omit_dra1=omit_dra1,
+                infer_class2_pair=infer_class2_pair)
+            normalized_names[raw_allele] = normalized
+        group = groups.get(normalized)
+        if group is None:
+            group = groups[normalized] = AlleleGroup([], [])
+        group.indices.append(i)
+        group.peptides.append(peptide)
+    return groups
+
+
+def scatter_group_results(groups, results_by_allele, n_rows=None, fill=None):
+    """
+    Puts per-group results back in the order of the original rows.
+
+    results_by_allele maps each allele in groups (as returned by
+    group_peptides_by_allele) to a sequence of results aligned with that
+    group's peptides. Rows of alleles missing from results_by_allele are
+    set to `fill`.
+    """
+    if n_rows is None:
+        n_rows = sum(len(group.indices) for group in groups.values())
+    result = [fill] * n_rows
+    for allele, group in groups.items():
+        if allele not in results_by_allele:
+            continue
+        group_results = results_by_allele[allele]
+        if len(group_results) != len(group.indices):
+            raise ValueError(
+                "Expected %d results for %s but got %d" % (
+                    len(group.indices), allele, len(group_results)))
+        for i, value in zip(group.indices, group_results):
+            result[i] = value
+    return result
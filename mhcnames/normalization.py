@@ -16,8 +16,13 @@ from __future__ import print_function, division, absolute_import
 
 from .allele_name import AlleleName
 from .class2 import parse_classi_or_classii_allele_name
+from .parsing_helpers import check_allele_name_length
 
 _normalized_allele_cache = {}
+_compact_allele_cache = {}
+
+# optional on-disk cache shared across processes, see set_persistent_cache
+_persistent_cache = None
 
 _DRA1_0101 = AlleleName(
     species="HLA",
@@ -25,6 +30,34 @@ _DRA1_0101 = AlleleName(
     allele_family="01",
     allele_code="01")
 
+COMPACT_CACHE_KIND = "compact"
+
+def normalize_cache_kind(omit_dra1, infer_class2_pair):
+    """
+    Name under which results of normalize_allele_name with the given options
+    are stored in a persistent cache.
+    """
+    return "normalize:%d:%d" % (bool(omit_dra1), bool(infer_class2_pair))
+
+def set_persistent_cache(cache):
+    """
+    Use an on-disk cache (such as mhcnames.PersistentCache) for the results
+    of normalize_allele_name and compact_allele_name, in addition to the
+    in-memory cache. Pass None to stop using it.
+
+    The in-memory caches are cleared so that results are read from the new
+    cache, and writes buffered by the previous cache are flushed.
+    """
+    global _persistent_cache
+    if _persistent_cache is not None:
+        _persistent_cache.flush()
+    _persistent_cache = cache
+    _normalized_allele_cache.clear()
+    _compact_allele_cache.clear()
+
+def get_persistent_cache():
+    return _persistent_cache
+
 def normalize_allele_name(raw_allele, omit_dra1=False, infer_class2_pair=True):
     """MHC alleles are named with a frustratingly loose system. It's not uncommon
     to see dozens of different forms for the same allele.
@@ -64,11 +97,30 @@ def normalize_allele_name(raw_allele, omit_dra1=False, infer_class2_pair=True):
 
     These should all be normalized to:
         HLA-A*02:01
+
+    Names longer than MAX_ALLELE_NAME_LENGTH are rejected with an
+    AlleleParseError before they're hashed or copied.
     """
+    check_allele_name_length(raw_allele)
     cache_key = (raw_allele, omit_dra1, infer_class2_pair)
     if cache_key in _normalized_allele_cache:
         return _normalized_allele_cache[cache_key]
 
+    if _persistent_cache is not None:
+        kind = normalize_cache_kind(omit_dra1, infer_class2_pair)
+        normalized = _persistent_cache.get(kind, raw_allele)
+        if normalized is None:
+            normalized = _normalize_allele_name_uncached(
+                raw_allele, omit_dra1, infer_class2_pair)
+            _persistent_cache.set(kind, raw_allele, normalized)
+    else:
+        normalized = _normalize_allele_name_uncached(
+            raw_allele, omit_dra1, infer_class2_pair)
+
+    _normalized_allele_cache[cache_key] = normalized
+    return normalized
+
+def _normalize_allele_name_uncached(raw_allele, omit_dra1, infer_class2_pair):
     parsed_alleles = parse_classi_or_classii_allele_name(
         raw_allele, infer_pair=infer_class2_pair)
     species = parsed_alleles[0].species
@@ -95,16 +147,29 @@ def normalize_allele_name(raw_allele, omit_dra1=False, infer_class2_pair=True):
             normalized_list.append("%s%s" % (
                 parsed_allele.gene,
                 parsed_allele.allele_code))
-    normalized = "-".join(normalized_list)
-
-    _normalized_allele_cache[cache_key] = normalized
-    return normalized
+    return "-".join(normalized_list)
 
 def compact_allele_name(raw_allele):
     """
     Turn HLA-A*02:01 into A0201 or H-2-D-b into H-2Db or
     HLA-DPA1*01:05-DPB1*100:01 into DPA10105-DPB110001
     """
+    check_allele_name_length(raw_allele)
+    if raw_allele in _compact_allele_cache:
+        return _compact_allele_cache[raw_allele]
+
+    if _persistent_cache is not None:
+        compact = _persistent_cache.get(COMPACT_CACHE_KIND, raw_allele)
+        if compact is None:
+            compact = _compact_allele_name_uncached(raw_allele)
+            _persistent_cache.set(COMPACT_CACHE_KIND, raw_allele, compact)
+    else:
+        compact = _compact_allele_name_uncached(raw_allele)
+
+    _compact_allele_cache[raw_allele] = compact
+    return compact
+
+def _compact_allele_name_uncached(raw_allele):
     parsed_alleles = parse_classi_or_classii_allele_name(raw_allele)
     normalized_list = []
     if len(parsed_alleles) == 2:
@@ -0,0 +1,211 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function, division, absolute_import
+
+from collections import OrderedDict
+import threading
+
+from six import string_types
+
+from .allele_parse_error import AlleleParseError
+from .normalization import (
+    _normalize_allele_name_uncached,
+    _compact_allele_name_uncached,
+)
+from .parsing_helpers import check_allele_name_length
+
+
+class BoundedCache(object):
+    """
+    Dictionary holding at most max_size entries, evicting the least
+    recently used entry when full. Safe to share between threads.
+    """
+    def __init__(self, max_size):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1, got %d" % max_size)
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    if hasattr(OrderedDict, "move_to_end"):
+        def get(self, key, default=None):
+            # each step is atomic with the C OrderedDict of Python 3, so
+            # lookups don't need the lock
+            try:
+                value = self._entries[key]
+            except KeyError:
+                return default
+            try:
+                # move the entry to the end of the eviction order
+                self._entries.move_to_end(key)
+            except KeyError:
+                # evicted by another thread in the meantime
+                pass
+            return value
+    else:
+        def get(self, key, default=None):
+            with self._lock:
+                try:
+                    value = self._entries.pop(key)
+                except KeyError:
+                    return default
+                # move the entry to the end of the eviction order
+                self._entries[key] = value
+                return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+            elif len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+            self._entries[key] = value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Normalizer(object):
+    """
+    Callable object which normalizes allele names with fixed options, for
+    sending to worker processes (e.g. with Dask, Spark or multiprocessing).
+
+    Besides its own bounded cache, a Normalizer holds a dictionary of known
+    spellings which can be filled once with `warm` and is pickled along
+    with the options, so workers start out with it. The bounded cache isn't
+    pickled.
+
+    Parameters
+    ----------
+    omit_dra1, infer_class2_pair : bool
+        Passed to normalize_allele_name
+
+    compact : bool
+        Return names in the style of compact_allele_name (e.g. "A0201")
+        instead of normalize_allele_name (e.g. "HLA-A*02:01"). Compact
+        names always omit DRA1*01:01, ignoring the other options.
+
+    max_cache_size : int
+        Number of spellings to keep in the bounded cache
+
+    known : dict, optional
+        Raw spellings mapped to their expected results
+    """
+    def __init__(
+            self,
+            omit_dra1=False,
+            infer_class2_pair=True,
+            compact=False,
+            max_cache_size=100000,
+            known=None):
+        self.omit_dra1 = omit_dra1
+        self.infer_class2_pair = infer_class2_pair
+        self.compact = compact
+        self.max_cache_size = max_cache_size
+        self.known = dict(known) if known else {}
+        self._cache = BoundedCache(max_cache_size)
+
+    def _normalize_uncached(self, raw_allele):
+        check_allele_name_length(raw_allele)
+        if self.compact:
+            return _compact_allele_name_uncached(raw_allele)
+        return _normalize_allele_name_uncached(
+            raw_allele, self.omit_dra1, self.infer_class2_pair)
+
+    def normalize(self, raw_allele):
+        result = self.known.get(raw_allele)
+        if result is not None:
+            return result
+        result = self._cache.get(raw_allele)
+        if result is None:
+            result = self._normalize_uncached(raw_allele)
+            self._cache[raw_allele] = result
+        return result
+
+    __call__ = normalize
+
+    def normalize_many(self, raw_alleles):
+        """
+        Normalizes a whole chunk of allele names, e.g. as the function given
+        to Dask's map_partitions. Returns a list, or a Series with the same
+        index when given a pandas Series.
+
+        Missing values such as None or NaN (anything which isn't a string)
+        are passed through unchanged.
+        """
+        chunk_results = {}
+        results = []
+        for raw_allele in raw_alleles:
+            if not isinstance(raw_allele, string_types):
+                results.append(raw_allele)
+                continue
+            result = chunk_results.get(raw_allele)
+            if result is None:
+                result = chunk_results[raw_allele] = self.normalize(raw_allele)
+            results.append(result)
+        if hasattr(raw_alleles, "index") and hasattr(raw_alleles, "map"):
+            return type(raw_alleles)(
+                results, index=raw_alleles.index, name=raw_alleles.name)
+        return results
+
+    def warm(self, raw_alleles, skip_invalid=True):
+        """
+        Adds the results for the given spellings to the known dictionary, so
+        they are shipped along when this object is pickled. Unparseable
+        names are skipped unless skip_invalid is False.
+
+        Returns the number of spellings added.
+        """
+        n_added = 0
+        for raw_allele in raw_alleles:
+            if raw_allele in self.known:
+                continue
+            try:
+                self.known[raw_allele] = self._normalize_uncached(raw_allele)
+            except (AlleleParseError, ValueError):
+                if not skip_invalid:
+                    raise
+                continue
+            n_added += 1
+        return n_added
+
+    def __getstate__(self):
+        return {
+            "omit_dra1": self.omit_dra1,
+            "infer_class2_pair": self.infer_class2_pair,
+            "compact": self.compact,
+            "max_cache_size": self.max_cache_size,
+            "known": self.known,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return (
+            "Normalizer(omit_dra1=%s, infer_class2_pair=%s, compact=%s, "
+            "max_cache_size=%d, %d known spellings)" % (
+                self.omit_dra1,
+                self.infer_class2_pair,
+                self.compact,
+                self.max_cache_size,
+                len(self.known)))
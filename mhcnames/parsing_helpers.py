@@ -14,21 +14,38 @@
 
 from __future__ import print_function, division, absolute_import
 
+import os
+
+from .allele_parse_error import AlleleParseError
+
+# Longest allele name we'll try to parse. Real names, even alpha/beta pairs
+# with 8 digit typings and suffixes, are well under this, so anything longer
+# is rejected before any copy of the whole string is made.
+MAX_ALLELE_NAME_LENGTH = 128
+
+def check_allele_name_length(name):
+    if len(name) > MAX_ALLELE_NAME_LENGTH:
+        raise AlleleParseError(
+            "Allele name of length %d exceeds maximum of %d characters: %r..." % (
+                len(name), MAX_ALLELE_NAME_LENGTH, name[:20]))
+
 
 def parse_substring(allele, pred, max_len=None):
     """
-    Extract substring of letters for which predicate is True
+    Extract substring of letters for which predicate is True.
+
+    Scans each character at most once and slices the input once, so the
+    parsers built from these helpers (which call them a fixed number of
+    times) run in time linear in the length of the name.
     """
-    result = ""
     pos = 0
     if max_len is None:
         max_len = len(allele)
     else:
         max_len = min(max_len, len(allele))
     while pos < max_len and pred(allele[pos]):
-        result += allele[pos]
         pos += 1
-    return result, allele[pos:]
+    return allele[:pos], allele[pos:]
 
 
 SEPARATORS = {":", "*", "-"}
@@ -50,3 +67,39 @@ def parse_not_numbers(allele, max_len=None):
 
 def parse_until(allele, sep):
     return parse_substring(allele, lambda c: c != sep)
+
+
+def _load_speedups():
+    """
+    Returns the compiled _speedups extension, or None if it wasn't built or
+    has been disabled by setting the MHCNAMES_DISABLE_SPEEDUPS environment
+    variable.
+    """
+    if os.environ.get("MHCNAMES_DISABLE_SPEEDUPS"):
+        return None
+    try:
+        from . import _speedups
+    except ImportError:
+        return None
+    return _speedups
+
+speedups = _load_speedups()
+
+# keep the pure Python helpers around so they can be compared against
+# the compiled versions
+pure_python_helpers = {
+    "parse_separator": parse_separator,
+    "parse_alphanum": parse_alphanum,
+    "parse_letters": parse_letters,
+    "parse_numbers": parse_numbers,
+    "parse_not_numbers": parse_not_numbers,
+    "parse_until": parse_until,
+}
+
+if speedups is not None:
+    parse_separator = speedups.parse_separator
+    parse_alphanum = speedups.parse_alphanum
+    parse_letters = speedups.parse_letters
+    parse_numbers = speedups.parse_numbers
+    parse_not_numbers = speedups.parse_not_numbers
+    parse_until = speedups.parse_until
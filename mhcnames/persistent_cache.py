@@ -0,0 +1,272 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function, division, absolute_import
+
+import atexit
+import os
+import re
+import threading
+import weakref
+
+from .allele_parse_error import AlleleParseError
+from .normalization import (
+    COMPACT_CACHE_KIND,
+    normalize_cache_kind,
+    _normalize_allele_name_uncached,
+    _compact_allele_name_uncached,
+)
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS alleles (
+        kind TEXT NOT NULL,
+        raw_allele TEXT NOT NULL,
+        result TEXT NOT NULL,
+        PRIMARY KEY (kind, raw_allele))""",
+]
+
+
+def _mhcnames_version():
+    # imported here since the package __init__ imports this module
+    from . import __version__
+    return __version__
+
+
+# caches with buffered writes which still need to be flushed at exit
+_open_caches = weakref.WeakSet()
+
+
+def _version_tuple(version):
+    # e.g. (0, 4, 10) for "0.4.10", so that versions compare numerically
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+@atexit.register
+def _flush_open_caches():
+    if not _open_caches:
+        return
+    import sqlite3
+    for cache in list(_open_caches):
+        try:
+            cache.flush()
+        except sqlite3.Error:
+            pass
+
+
+class PersistentCache(object):
+    """
+    SQLite-backed cache of allele name normalizations which can be shared
+    by many processes on one machine.
+
+    The database uses write-ahead logging so readers never block each other
+    or a writer, and concurrent writers wait on SQLite's lock for up to
+    `timeout` seconds.
+
+    Every row is stored under the version of mhcnames which wrote it and
+    only rows of the current version are ever returned, so processes still
+    running an older version can't feed it stale results. Rows of other
+    versions are deleted when a newer version than any before opens the
+    cache, so processes of an older version don't empty it.
+
+    Calls to `set` are buffered and written in one transaction once
+    `write_batch_size` rows are pending, when `flush` or `close` is called,
+    or at exit.
+    """
+    def __init__(self, path, timeout=30.0, write_batch_size=1000):
+        self.path = path
+        self.timeout = timeout
+        self.write_batch_size = write_batch_size
+        self.version = _mhcnames_version()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._pending = {}
+        _open_caches.add(self)
+
+    def _versioned_kind(self, kind):
+        return "%s|%s" % (self.version, kind)
+
+    def _connect(self):
+        # SQLite connections can't be shared with forked child processes,
+        # so each process opens its own
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        # imported here so that importing mhcnames doesn't need sqlite3
+        import sqlite3
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            row = connection.execute(
+                "SELECT value FROM metadata WHERE key = 'version'").fetchone()
+            if row is None or (
+                    _version_tuple(self.version) > _version_tuple(row[0])):
+                connection.execute(
+                    "DELETE FROM alleles WHERE substr(kind, 1, ?) != ?",
+                    (len(self.version) + 1, self._versioned_kind("")))
+                connection.execute(
+                    "INSERT OR REPLACE INTO metadata (key, value) "
+                    "VALUES ('version', ?)", (self.version,))
+            connection.execute("COMMIT")
+        except:
+            connection.execute("ROLLBACK")
+            connection.close()
+            raise
+        self._connection = connection
+        self._pid = os.getpid()
+        return connection
+
+    def get(self, kind, raw_allele):
+        """
+        Returns the cached result for raw_allele, or None if there isn't one.
+        """
+        with self._lock:
+            result = self._pending.get((kind, raw_allele))
+            if result is not None:
+                return result
+            row = self._connect().execute(
+                "SELECT result FROM alleles WHERE kind = ? AND raw_allele = ?",
+                (self._versioned_kind(kind), raw_allele)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def set(self, kind, raw_allele, result):
+        """
+        Buffers one result, writing out the buffer once it's full.
+        """
+        with self._lock:
+            self._pending[(kind, raw_allele)] = result
+            if len(self._pending) < self.write_batch_size:
+                return
+            rows = self._take_pending()
+        self.set_many(rows)
+
+    def _take_pending(self):
+        rows = [
+            (kind, raw_allele, result)
+            for ((kind, raw_allele), result) in self._pending.items()]
+        self._pending = {}
+        return rows
+
+    def flush(self):
+        """
+        Writes out results buffered by `set`.
+        """
+        with self._lock:
+            rows = self._take_pending()
+        if rows:
+            self.set_many(rows)
+
+    def set_many(self, rows):
+        """
+        Writes a sequence of (kind, raw_allele, result) triples in a
+        single transaction.
+        """
+        rows = [
+            (self._versioned_kind(kind), raw_allele, result)
+            for (kind, raw_allele, result) in rows]
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO alleles (kind, raw_allele, result) "
+                    "VALUES (?, ?, ?)", rows)
+                connection.execute("COMMIT")
+            except:
+                connection.execute("ROLLBACK")
+                raise
+
+    def clear(self):
+        with self._lock:
+            self._pending = {}
+            self._connect().execute("DELETE FROM alleles")
+
+    def __len__(self):
+        """
+        Number of results stored by the current version, not counting
+        buffered writes.
+        """
+        with self._lock:
+            return self._connect().execute(
+                "SELECT COUNT(*) FROM alleles WHERE substr(kind, 1, ?) = ?",
+                (len(self.version) + 1, self._versioned_kind(""))).fetchone()[0]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self._pid = None
+
+    def __getstate__(self):
+        return {
+            "path": self.path,
+            "timeout": self.timeout,
+            "write_batch_size": self.write_batch_size,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+def warm_persistent_cache(
+        cache,
+        raw_alleles,
+        omit_dra1=False,
+        infer_class2_pair=True,
+        batch_size=10000):
+    """
+    Fills a persistent cache with both the normalized and compact forms of
+    every allele name in raw_alleles. Names which can't be parsed are skipped.
+
+    Returns a pair with the number of names cached and the number skipped.
+    """
+    kind = normalize_cache_kind(omit_dra1, infer_class2_pair)
+    seen = set()
+    rows = []
+    n_cached = 0
+    n_skipped = 0
+    for raw_allele in raw_alleles:
+        if raw_allele in seen:
+            continue
+        seen.add(raw_allele)
+        try:
+            normalized = _normalize_allele_name_uncached(
+                raw_allele, omit_dra1, infer_class2_pair)
+            compact = _compact_allele_name_uncached(raw_allele)
+        except (AlleleParseError, ValueError):
+            n_skipped += 1
+            continue
+        rows.append((kind, raw_allele, normalized))
+        rows.append((COMPACT_CACHE_KIND, raw_allele, compact))
+        n_cached += 1
+        if len(rows) >= batch_size:
+            cache.set_many(rows)
+            rows = []
+    if rows:
+        cache.set_many(rows)
+    return n_cached, n_skipped
@@ -16,6 +16,8 @@ from __future__ import print_function, division, absolute_import
 
 from six import string_types
 
+from .parsing_helpers import speedups
+
 # copied from https://www.ebi.ac.uk/ipd/mhc/species.html
 species_name_to_prefixes = dict(
     human="HLA",
@@ -72,7 +74,40 @@ species_name_to_prefixes = dict(
     squirrel_monkey="Sasc",
     lemur="Leca")
 
-prefix_to_species_name = {}
+class _PrefixToSpeciesDict(dict):
+    """
+    Dictionary from species prefixes to species names which also accepts
+    prefixes in any case, e.g. "hla" or "MAMU".
+    """
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._upper_prefix_to_species_name = {}
+
+    def __setitem__(self, prefix, species):
+        dict.__setitem__(self, prefix, species)
+        self._upper_prefix_to_species_name[prefix.upper()] = species
+
+    def __missing__(self, prefix):
+        if isinstance(prefix, string_types):
+            upper_prefix = prefix.upper()
+            if upper_prefix in self._upper_prefix_to_species_name:
+                return self._upper_prefix_to_species_name[upper_prefix]
+        raise KeyError(prefix)
+
+    def __contains__(self, prefix):
+        if dict.__contains__(self, prefix):
+            return True
+        return (
+            isinstance(prefix, string_types) and
+            prefix.upper() in self._upper_prefix_to_species_name)
+
+    def get(self, prefix, default=None):
+        try:
+            return self[prefix]
+        except KeyError:
+            return default
+
+prefix_to_species_name = _PrefixToSpeciesDict()
 
 _preferred_prefixes = []
 _alternate_prefixes = []
@@ -90,11 +125,29 @@ for (species, prefixes) in species_name_to_prefixes.items():
 # list of all species specific prefixes in search order
 _all_prefixes = _preferred_prefixes + _alternate_prefixes
 
-def split_species_prefix(name, seps="-:_ "):
-    """
-    Splits off the species component of the allele name from the rest of it.
+_DEFAULT_SEPARATORS = "-:_ "
 
-    Given "HLA-A*02:01", returns ("HLA", "A*02:01").
+# Maps each uppercase prefix, both alone and followed by one of the default
+# separators (e.g. "HLA", "HLA-", "HLA_", "HLA:", "HLA "), to a tuple of
+# the canonical prefix, the number of characters it consumes and its
+# position in the search order (earlier prefixes win when several match).
+_prefix_table = {}
+
+for rank, prefix in enumerate(_all_prefixes):
+    upper_prefix = prefix.upper()
+    for sep in [""] + list(_DEFAULT_SEPARATORS):
+        key = upper_prefix + sep
+        if key not in _prefix_table:
+            _prefix_table[key] = (prefix, len(key), rank)
+
+# distinct prefix lengths, shortest first
+_prefix_lengths = sorted(set(len(prefix) for prefix in _all_prefixes))
+
+def _search_species_prefix(name, seps=_DEFAULT_SEPARATORS):
+    """
+    Reference implementation of split_species_prefix which compares the name
+    against each prefix in turn. Used for names whose uppercase form doesn't
+    line up character-by-character with the original.
     """
     species = None
     name_upper = name.upper()
@@ -108,3 +161,50 @@ def split_species_prefix(name, seps="-:_ "):
             name = name[n:].strip(seps)
             break
     return (species, name)
+
+def _lookup_species_prefix(name, seps=_DEFAULT_SEPARATORS):
+    """
+    Finds the species prefix with a few probes of _prefix_table instead of
+    comparing the name against every prefix.
+    """
+    name_len = len(name)
+    best = None
+    for n in _prefix_lengths:
+        if name_len <= n:
+            break
+        head = name[:n + 1].upper()
+        if len(head) != n + 1:
+            # some characters (e.g. "\u00df") uppercase to several letters
+            return _search_species_prefix(name, seps)
+        # the prefix followed by a separator, then the bare prefix
+        for entry in (_prefix_table.get(head), _prefix_table.get(head[:n])):
+            if (entry is not None and
+                    len(entry[0]) < name_len and
+                    (best is None or entry[2] < best[2])):
+                best = entry
+    if best is None:
+        return (None, name)
+    prefix, consumed, _ = best
+    if seps != _DEFAULT_SEPARATORS:
+        consumed = len(prefix)
+    rest = name[consumed:]
+    if rest and (rest[0] in seps or rest[-1] in seps):
+        rest = rest.strip(seps)
+    return (prefix, rest)
+
+
+# Compiled search of the prefixes, if the extension is available. It doesn't
+# allocate anything for prefixes which don't match, which still beats slicing
+# and uppercasing for the table.
+_split_prefix = speedups.split_prefix if speedups is not None else None
+
+
+def split_species_prefix(name, seps=_DEFAULT_SEPARATORS):
+    """
+    Splits off the species component of the allele name from the rest of it.
+
+    Given "HLA-A*02:01", returns ("HLA", "A*02:01").
+    """
+    if _split_prefix is not None:
+        return _split_prefix(name, _all_prefixes, seps)
+    return _lookup_species_prefix(name, seps)
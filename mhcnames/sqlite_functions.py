@@ -0,0 +1,126 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+SQLite user-defined functions for working with allele names inside a
+database, e.g.:
+
+    import sqlite3
+    from mhcnames import register_sqlite_functions
+
+    connection = sqlite3.connect("cohort.db")
+    register_sqlite_functions(connection)
+    connection.execute("UPDATE samples SET allele = mhc_normalize(allele)")
+    connection.execute(
+        "SELECT mhc_gene(allele), COUNT(*) FROM samples GROUP BY 1")
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from six import string_types
+
+from .allele_parse_error import AlleleParseError
+from .class2 import parse_classi_or_classii_allele_name
+from .normalizer import Normalizer, BoundedCache
+from .parsing_helpers import check_allele_name_length
+
+
+def _null_on_error(fn, failures):
+    """
+    Wraps a function of an allele name so that it returns NULL (None) for
+    non-text values and unparseable names instead of raising. Unparseable
+    names are remembered in the bounded cache `failures` so they're only
+    parsed once.
+    """
+    def sqlite_function(value):
+        if not isinstance(value, string_types) or value in failures:
+            return None
+        try:
+            return fn(value)
+        except (AlleleParseError, ValueError):
+            failures[value] = True
+            return None
+    return sqlite_function
+
+
+def _create_function(connection, name, fn, deterministic=True):
+    # imported here so that importing mhcnames doesn't need sqlite3
+    import sqlite3
+    if not deterministic:
+        connection.create_function(name, 1, fn)
+        return
+    try:
+        connection.create_function(name, 1, fn, deterministic=True)
+    except (TypeError, sqlite3.NotSupportedError):
+        # deterministic functions need Python 3.8+ and SQLite 3.8.3+
+        connection.create_function(name, 1, fn)
+
+
+def register_sqlite_functions(
+        connection,
+        omit_dra1=False,
+        infer_class2_pair=True,
+        max_cache_size=100000):
+    """
+    Registers these functions of one allele name on a sqlite3 connection:
+        - mhc_normalize: normalize_allele_name with the given options
+        - mhc_compact: compact_allele_name
+        - mhc_species: species prefix, e.g. "HLA"
+        - mhc_gene: gene name, e.g. "A" or "DPA1-DPB1" for alpha/beta pairs
+
+    They return NULL for NULL, non-text or unparseable values. Each keeps
+    up to max_cache_size results in a bounded cache, and they're marked as
+    deterministic where supported so they can be used in indexes.
+
+    mhc_normalize is only marked as deterministic with the default options,
+    since an index built with one setting of omit_dra1 or infer_class2_pair
+    would be wrong for a connection registering another. With other
+    options it can't be used in indexes.
+    """
+    normalizer = Normalizer(
+        omit_dra1=omit_dra1,
+        infer_class2_pair=infer_class2_pair,
+        max_cache_size=max_cache_size)
+    compact_normalizer = Normalizer(compact=True, max_cache_size=max_cache_size)
+    # mhc_species and mhc_gene share the parsed chains of each name
+    parsed_cache = BoundedCache(max_cache_size)
+
+    def parse(name):
+        parsed = parsed_cache.get(name)
+        if parsed is None:
+            check_allele_name_length(name)
+            parsed = parse_classi_or_classii_allele_name(name, infer_pair=False)
+            parsed_cache[name] = parsed
+        return parsed
+
+    def species(name):
+        return parse(name)[0].species
+
+    def gene(name):
+        # both chains of alpha/beta pairs, e.g. "DPA1-DPB1"
+        return "-".join(allele.gene for allele in parse(name))
+
+    default_options = not omit_dra1 and infer_class2_pair
+    functions = [
+        ("mhc_normalize", normalizer.normalize, default_options),
+        ("mhc_compact", compact_normalizer.normalize, True),
+        ("mhc_species", species, True),
+        ("mhc_gene", gene, True),
+    ]
+    for name, fn, deterministic in functions:
+        _create_function(
+            connection,
+            name,
+            _null_on_error(fn, BoundedCache(max_cache_size)),
+            deterministic=deterministic)
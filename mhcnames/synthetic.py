@@ -0,0 +1,298 @@
+# Copyright (c) 2017. Mount Sinai School of Medicine
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Seeded generator of realistic allele name spellings along with their
+expected normalizations, for load tests and differential tests which can't
+use patient data.
+
+The expected names are built alongside each spelling rather than by calling
+normalize_allele_name, so they can be used to check it.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import namedtuple
+import random
+
+from six import string_types
+
+from .parsing_helpers import MAX_ALLELE_NAME_LENGTH
+from .species import species_name_to_prefixes
+
+SyntheticAllele = namedtuple("SyntheticAllele", [
+    "name",
+    # result expected from normalize_allele_name, or None if the name is
+    # malformed and should be rejected
+    "expected",
+])
+
+# relative frequency of each kind of well formed allele name
+DEFAULT_WEIGHTS = {
+    "human_class1": 0.5,
+    "human_class2": 0.15,
+    "human_class2_pair": 0.1,
+    "mouse": 0.1,
+    "other_species": 0.15,
+}
+
+_human_prefixes = ["HLA-", "hla-", "HLA_", "HLA:", "HLA ", ""]
+_class1_genes = ["A", "B", "C"]
+
+# beta chain genes and the alpha chain normalize_allele_name infers for them
+_class2_beta_genes = {
+    "DRB1": "DRA1*01:01",
+    "DRB3": "DRA1*01:01",
+    "DRB4": "DRA1*01:01",
+    "DRB5": "DRA1*01:01",
+    "DQB1": "DQA1*01:02",
+    "DPB1": "DPA1*01:03",
+}
+_class2_pair_genes = [("DRA1", "DRB1"), ("DQA1", "DQB1"), ("DPA1", "DPB1")]
+
+_mouse_prefixes = ["H2-", "H-2-", "h2-", "H2", "H-2", "H2_"]
+_mouse_genes = ["K", "D", "L", "IA", "IE"]
+_mouse_haplotypes = "bdkqsu"
+
+_other_species_prefixes = sorted(
+    prefix
+    for (species, prefixes) in species_name_to_prefixes.items()
+    if species not in ("human", "mouse")
+    for prefix in ([prefixes] if isinstance(prefixes, string_types) else prefixes))
+_other_species_genes = ["A", "B", "C", "E", "G"]
+
+# expression suffixes and extra fields of higher resolution typings
+_suffixes = "NLSQG"
+
+
+# Choices are all derived from rng.random(), since randint and choice give
+# different sequences on Python 2 and 3 for the same seed.
+def _randint(rng, low, high):
+    return low + int(rng.random() * (high - low + 1))
+
+
+def _choice(rng, seq):
+    return seq[int(rng.random() * len(seq))]
+
+
+def _random_case(rng, s):
+    choice = rng.random()
+    if choice < 0.6:
+        return s
+    elif choice < 0.8:
+        return s.lower()
+    return s.upper()
+
+
+def _number(rng, low, high):
+    # skew towards small numbers, which are the most common in practice
+    return min(_randint(rng, low, high), _randint(rng, low, high))
+
+
+def _format_field(value):
+    return "%02d" % value
+
+
+def _extra_resolution(rng):
+    """
+    Random third and fourth fields and expression suffix, e.g. ":01:02N"
+    """
+    fields = [":%02d" % _number(rng, 1, 20) for _ in range(_randint(rng, 0, 2))]
+    suffix = _choice(rng, _suffixes) if rng.random() < 0.2 else ""
+    return "".join(fields) + suffix
+
+
+def _human_class1(rng, extended_resolution):
+    gene = _choice(rng, _class1_genes)
+    family = _format_field(_number(rng, 1, 99))
+    code = _format_field(_number(rng, 1, 180))
+    expected = "HLA-%s*%s:%s" % (gene, family, code)
+    prefix = _choice(rng, _human_prefixes)
+    gene_sep = _choice(rng, ["*", "*", "", ":"])
+    code_sep = _choice(rng, [":", ":", ""])
+    name = "%s%s%s%s%s%s" % (
+        prefix, _random_case(rng, gene), gene_sep, family, code_sep, code)
+    if extended_resolution and code_sep:
+        name += _extra_resolution(rng)
+    return name, expected
+
+
+def _human_class2(rng, extended_resolution):
+    gene = _choice(rng, sorted(_class2_beta_genes))
+    if gene == "DPB1" and rng.random() < 0.3:
+        family = str(_randint(rng, 100, 199))
+    else:
+        family = _format_field(_number(rng, 1, 99))
+    code = _format_field(_number(rng, 1, 99))
+    expected = "HLA-%s-%s*%s:%s" % (
+        _class2_beta_genes[gene], gene, family, code)
+    prefix = _choice(rng, ["HLA-", "hla-", ""])
+    gene_sep = _choice(rng, ["*", "*", "_", ":", ""])
+    code_sep = _choice(rng, [":", ""])
+    name = "%s%s%s%s%s%s" % (
+        prefix, _random_case(rng, gene), gene_sep, family, code_sep, code)
+    if extended_resolution and code_sep:
+        name += _extra_resolution(rng)
+    return name, expected
+
+
+def _human_class2_pair(rng, extended_resolution):
+    chains = []
+    expected_chains = []
+    for gene in _choice(rng, _class2_pair_genes):
+        if gene == "DRA1":
+            # DRA is nearly monomorphic
+            family, code = "01", _choice(rng, ["01", "02"])
+        elif gene == "DPB1" and rng.random() < 0.3:
+            family = str(_randint(rng, 100, 199))
+            code = _format_field(_number(rng, 1, 99))
+        else:
+            family = _format_field(_number(rng, 1, 99))
+            code = _format_field(_number(rng, 1, 99))
+        expected_chains.append("%s*%s:%s" % (gene, family, code))
+        code_sep = _choice(rng, [":", ""])
+        chains.append("%s%s%s%s%s" % (
+            _random_case(rng, gene),
+            "*" if code_sep else _choice(rng, ["*", ""]),
+            family,
+            code_sep,
+            code))
+    prefix = _choice(rng, ["HLA-", "hla-", ""])
+    name = prefix + _choice(rng, ["-", "/"]).join(chains)
+    return name, "HLA-" + "-".join(expected_chains)
+
+
+def _mouse(rng, extended_resolution):
+    gene = _choice(rng, _mouse_genes)
+    haplotype = _choice(rng, _mouse_haplotypes)
+    name = "%s%s%s" % (
+        _choice(rng, _mouse_prefixes),
+        _random_case(rng, gene),
+        _random_case(rng, haplotype))
+    return name, "H-2-%s%s" % (gene, haplotype)
+
+
+def _other_species(rng, extended_resolution):
+    prefix = _choice(rng, _other_species_prefixes)
+    gene = _choice(rng, _other_species_genes)
+    family_number = _number(rng, 1, 150)
+    if family_number < 100 and rng.random() < 0.3:
+        # three digit families with a leading zero lose it, e.g. Mamu-B*082
+        family = "0%02d" % family_number
+    else:
+        family = _format_field(family_number)
+    code_number = _number(rng, 1, 120)
+    code = _format_field(code_number)
+    expected = "%s-%s*%s:%s" % (
+        prefix, gene, _format_field(family_number), code)
+    if len(family) == 2 and len(code) == 2 and rng.random() < 0.3:
+        code_sep = ""
+    else:
+        code_sep = ":"
+    name = "%s%s%s%s%s%s%s" % (
+        _random_case(rng, prefix),
+        _choice(rng, ["-", "_"]),
+        _random_case(rng, gene),
+        _choice(rng, ["*", "*", ""]),
+        family,
+        code_sep,
+        code)
+    return name, expected
+
+
+_generators = {
+    "human_class1": _human_class1,
+    "human_class2": _human_class2,
+    "human_class2_pair": _human_class2_pair,
+    "mouse": _mouse,
+    "other_species": _other_species,
+}
+
+
+def _malformed(rng, name):
+    """
+    Corrupts a well formed name in a way the parser is known to reject.
+    """
+    choice = _randint(rng, 0, 5)
+    if choice == 0:
+        junk = "".join(
+            _choice(rng, "abcdefghijklmnopqrstuvwxyz")
+            for _ in range(_randint(rng, 1, 6)))
+        return "%s %s" % (name, junk)
+    elif choice == 1:
+        return name + _choice(rng, ["!!", "?", "#", "%"])
+    elif choice == 2:
+        return _choice(rng, ["", " ", "HLA-", "H2-", "Mamu-", "-", "/"])
+    elif choice == 3:
+        return _choice(rng, ["%%%", "***", "::", "()"])
+    elif choice == 4:
+        return "%s--%s" % (name, name)
+    else:
+        return name + "0" * MAX_ALLELE_NAME_LENGTH
+
+
+def generate_allele_names(
+        n,
+        seed=0,
+        malformed_fraction=0.05,
+        extended_resolution=False,
+        weights=None):
+    """
+    Lazily generates n SyntheticAllele objects. The same seed always
+    gives the same sequence, on both Python 2 and 3.
+
+    Parameters
+    ----------
+    n : int
+        Number of names to generate
+
+    seed : int
+        Seed of the random number generator
+
+    malformed_fraction : float
+        Fraction of names which are corrupted so they can't be parsed, with
+        None as their expected normalization
+
+    extended_resolution : bool
+        Also add third and fourth fields and expression suffixes
+        (e.g. "A*02:01:01:02N") to some human names, with the two field
+        name as the expected normalization. normalize_allele_name doesn't
+        accept these yet, so they're left out by default.
+
+    weights : dict, optional
+        Relative frequency of each kind of name, with the same keys as
+        DEFAULT_WEIGHTS
+    """
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    for kind in weights:
+        if kind not in _generators:
+            raise ValueError("Unknown kind of allele name '%s', expected one of: %s" % (
+                kind, ", ".join(sorted(_generators))))
+    kinds = sorted(weights)
+    cumulative_weights = []
+    total = 0.0
+    for kind in kinds:
+        total += weights[kind]
+        cumulative_weights.append(total)
+    rng = random.Random(seed)
+    for _ in range(n):
+        r = rng.random() * total
+        for kind, cumulative_weight in zip(kinds, cumulative_weights):
+            if r < cumulative_weight:
+                break
+        name, expected = _generators[kind](rng, extended_resolution)
+        if rng.random() < malformed_fraction:
+            name, expected = _malformed(rng, name), None
+        yield SyntheticAllele(name, expected)
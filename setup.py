@@ -15,8 +15,9 @@
 import os
 import logging
 import re
+import sys
 
-from setuptools import setup
+from setuptools import setup, Extension
 
 readme_dir = os.path.dirname(__file__)
 readme_path = os.path.join(readme_dir, 'README.md')
@@ -45,6 +46,18 @@ with open('mhcnames/__init__.py', 'r') as f:
 if not version:
     raise RuntimeError('Cannot find version information')
 
+# The compiled parsing helpers are optional: if they can't be built then
+# mhcnames falls back to its pure Python implementation.
+if sys.version_info >= (3, 3):
+    ext_modules = [
+        Extension(
+            'mhcnames._speedups',
+            sources=['mhcnames/_speedups.c'],
+            optional=True),
+    ]
+else:
+    ext_modules = []
+
 if __name__ == '__main__':
     setup(
         name='mhcnames',
@@ -64,6 +77,15 @@ if __name__ == '__main__':
             'Topic :: Scientific/Engineering :: Bio-Informatics',
         ],
         install_requires=['six>=1.9.0'],
+        extras_require={
+            'numpy': ['numpy'],
+        },
         long_description=readme_restructured,
         packages=['mhcnames'],
+        ext_modules=ext_modules,
+        entry_points={
+            'console_scripts': [
+                'mhcnames = mhcnames.cli:main',
+            ],
+        },
     )
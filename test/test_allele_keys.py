@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+from unittest import SkipTest
+
+from nose.tools import eq_, ok_, raises
+
+from mhcnames import (
+    AlleleName,
+    parse_allele_name,
+    encode_allele,
+    decode_allele,
+    encode_allele_name,
+)
+from mhcnames import allele_keys
+
+alleles = [
+    parse_allele_name(name)
+    for name in [
+        "HLA-A*02:01", "HLA-A*02:05", "HLA-A*11:01", "HLA-B*15:120",
+        "HLA-DRB1*01:02", "HLA-DPB1*100:01", "H2-Kd", "H2-IAb",
+        "Mamu-B*082:02", "Ovar-N*50001", "SLA-1-HB01", "SLA-2*jh01",
+        "DLA-DQA1*00101",
+    ]
+]
+
+
+def require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SkipTest("numpy not installed")
+
+
+def test_encode_decode_roundtrip():
+    for allele in alleles:
+        key = encode_allele(allele)
+        ok_(0 < key < 2 ** 63)
+        eq_(decode_allele(key), allele)
+
+
+def test_key_order_matches_natural_order():
+    def natural_order(allele):
+        def field_order(field):
+            if field.isdigit():
+                return (0, int(field), "")
+            return (1, 0, field)
+        return (
+            allele.species.upper(),
+            allele.gene,
+            field_order(allele.allele_family),
+            field_order(allele.allele_code))
+    eq_(sorted(alleles, key=encode_allele),
+        sorted(alleles, key=natural_order))
+
+
+@raises(ValueError)
+def test_encode_long_swine_family():
+    encode_allele(parse_allele_name("SLA-2*w09pt22"))
+
+
+@raises(ValueError)
+def test_encode_unknown_species():
+    encode_allele(AlleleName("XYZ", "A", "01", "01"))
+
+
+def test_encode_allele_name_pairs():
+    eq_(len(encode_allele_name("HLA-A*02:01")), 1)
+    alpha, beta = encode_allele_name("HLA-DPA1*01:05-DPB1*100:01")
+    eq_(decode_allele(alpha), AlleleName("HLA", "DPA1", "01", "05"))
+    eq_(decode_allele(beta), AlleleName("HLA", "DPB1", "100", "01"))
+    eq_(len(encode_allele_name("DRB1*01:02", infer_pair=False)), 1)
+
+
+def test_vectorized_encode_decode():
+    require_numpy()
+    names = ["A0201", "HLA-A*02:01", "DRB1*01:02", "H2-Kd"]
+    keys = allele_keys.encode(names)
+    eq_(keys.shape, (4, 2))
+    eq_(str(keys.dtype), "int64")
+    eq_(keys[0, 0], keys[1, 0])
+    eq_(keys[0, 1], allele_keys.NO_ALLELE_KEY)
+    decoded = allele_keys.decode(keys)
+    eq_(decoded[0, 0], AlleleName("HLA", "A", "02", "01"))
+    eq_(decoded[0, 1], None)
+    eq_(decoded[2, 0], AlleleName("HLA", "DRA1", "01", "01"))
+    eq_(decoded[2, 1], AlleleName("HLA", "DRB1", "01", "02"))
+    eq_(decoded[3, 0], AlleleName("H-2", "K", "", "d"))
+
+
+def test_vectorized_encode_unencodable_names():
+    require_numpy()
+    names = ["A0201", "SLA-2*07we01", "not an allele"]
+    keys = allele_keys.encode(names, raise_on_error=False)
+    eq_(keys.shape, (3, 2))
+    eq_(list(keys[1]), [allele_keys.NO_ALLELE_KEY] * 2)
+    eq_(list(keys[2]), [allele_keys.NO_ALLELE_KEY] * 2)
+    eq_(allele_keys.decode(keys)[0, 0], AlleleName("HLA", "A", "02", "01"))
+    eq_(allele_keys.encode([]).shape, (0, 2))
+
+
+def test_vectorized_encode_missing_values():
+    require_numpy()
+    keys = allele_keys.encode(
+        ["A0201", None, float("nan"), "A0201"], raise_on_error=False)
+    eq_(keys[1].tolist(), [allele_keys.NO_ALLELE_KEY] * 2)
+    eq_(keys[2].tolist(), [allele_keys.NO_ALLELE_KEY] * 2)
+    eq_(keys[3].tolist(), keys[0].tolist())
+
+
+@raises(ValueError)
+def test_vectorized_encode_raises_on_missing_value():
+    require_numpy()
+    allele_keys.encode(["A0201", None])
+
+
+@raises(ValueError)
+def test_vectorized_encode_raises_on_unencodable_name():
+    require_numpy()
+    allele_keys.encode(["A0201", "SLA-2*07we01"])
+
+
+def test_truncate_keys():
+    require_numpy()
+    keys = allele_keys.encode(["A*02:01", "A*02:05", "A*11:01"])[:, 0]
+    eq_(len(set(allele_keys.truncate(keys, "allele"))), 3)
+    eq_(len(set(allele_keys.truncate(keys, "family"))), 2)
+    eq_(len(set(allele_keys.truncate(keys, "gene"))), 1)
+
+
+def test_import_doesnt_load_numpy():
+    output = subprocess.check_output([
+        sys.executable,
+        "-c",
+        "import sys, mhcnames; print('numpy' in sys.modules)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    eq_(output.decode("ascii").strip(), "False")
@@ -0,0 +1,126 @@
+import os
+import pickle
+import subprocess
+import sys
+
+from nose.tools import eq_, ok_, raises
+
+from mhcnames import AlleleName, AlleleSet, pairwise_match_counts
+
+
+def test_allele_set_normalizes_spellings():
+    alleles = AlleleSet(["HLA-A*02:01", "A0201", "a*02:01", "B*07:02"])
+    eq_(len(alleles), 2)
+    ok_("A2" in alleles)
+    ok_(AlleleName("HLA", "B", "07", "02") in alleles)
+    ok_("HLA-C*07:02" not in alleles)
+
+
+def test_allele_set_splits_class2_pairs():
+    alleles = AlleleSet(["HLA-DPA1*01:05-DPB1*100:01", "DRB1*15:01"])
+    eq_(len(alleles), 3)
+    ok_("DPB1*100:01" in alleles)
+    # no alpha chain is inferred for a lone beta chain
+    ok_("DRA1*01:01" not in alleles)
+
+
+def test_allele_set_resolutions():
+    donor = AlleleSet(["A*02:01", "A*03:01", "B*07:02", "B*08:01"])
+    recipient = AlleleSet(["A*02:05", "A*03:01", "B*07:02", "C*07:01"])
+    eq_(donor & recipient, AlleleSet(["A*03:01", "B*07:02"]))
+    eq_(donor.intersection(recipient, resolution="family"),
+        AlleleSet(["A*02:01", "A*03:01", "B*07:02"]))
+    eq_(donor.intersection(recipient, resolution="gene"), donor)
+    eq_(donor - recipient, AlleleSet(["A*02:01", "B*08:01"]))
+    eq_(donor.difference(recipient, resolution="family"),
+        AlleleSet(["B*08:01"]))
+    eq_(donor.count_matches(recipient), 2)
+    eq_(donor.count_matches(recipient, resolution="family"), 3)
+    eq_(donor.count_matches(recipient, resolution="gene"), 2)
+    ok_(donor.matches("A*02:99", resolution="family"))
+    ok_(not donor.matches("A*02:99"))
+    eq_(len(donor | recipient), 6)
+
+
+@raises(ValueError)
+def test_allele_set_bad_resolution():
+    AlleleSet(["A*02:01"]).keys("serotype")
+
+
+def test_pairwise_match_counts():
+    donors = [["A*02:01", "B*07:02"], ["A*01:01", "B*08:01"]]
+    recipients = [
+        AlleleSet(["A*02:01", "B*07:05"]),
+        AlleleSet(["A*24:02"]),
+        AlleleSet([]),
+    ]
+    eq_(pairwise_match_counts(donors, recipients),
+        [[1, 0, 0], [0, 0, 0]])
+    eq_(pairwise_match_counts(donors, recipients, resolution="family"),
+        [[2, 0, 0], [0, 0, 0]])
+    eq_(pairwise_match_counts(donors, recipients, resolution="gene"),
+        [[2, 1, 0], [2, 1, 0]])
+
+
+def run_script(script, stdin=b""):
+    process = subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    stdout, _ = process.communicate(stdin)
+    eq_(process.returncode, 0)
+    return stdout
+
+
+def test_allele_set_pickled_in_another_process():
+    # each fresh interpreter compares a different allele first, so the
+    # unpickled set mustn't depend on anything computed where it was pickled
+    pickled = run_script(
+        "import pickle, sys\n"
+        "from mhcnames import AlleleSet\n"
+        "b = AlleleSet(['B*07:02'])\n"
+        "b.keys()\n"
+        "getattr(sys.stdout, 'buffer', sys.stdout).write(pickle.dumps(b, 2))\n")
+    result = run_script(
+        "import pickle, sys\n"
+        "from mhcnames import AlleleSet\n"
+        "a = AlleleSet(['A*02:01'])\n"
+        "a.keys()\n"
+        "b = pickle.loads(getattr(sys.stdin, 'buffer', sys.stdin).read())\n"
+        "print('%s %d %d' % (a.matches(b), a.count_matches(b), len(a & b)))\n",
+        stdin=pickled)
+    eq_(result.decode("utf-8").split(), ["False", "0", "0"])
+
+
+def test_allele_set_pickle_round_trip():
+    alleles = AlleleSet(["A*02:01", "B*07:02"])
+    alleles.keys("family")
+    copy = pickle.loads(pickle.dumps(alleles))
+    eq_(copy, alleles)
+    ok_(copy.matches(["A*02:05"], resolution="family"))
+
+
+def test_allele_set_mouse_families():
+    alleles = AlleleSet(["H-2-Kd"])
+    ok_(not alleles.matches(["H-2-Kb"], resolution="family"))
+    ok_(alleles.matches(["H-2-Kd"], resolution="family"))
+    ok_(alleles.matches(["H-2-Kb"], resolution="gene"))
+    eq_(pairwise_match_counts([["H-2-Kd", "H-2-Db"]], [["H-2-Kb", "H-2-Db"]],
+                              resolution="family"),
+        [[1]])
+
+
+def test_allele_set_unencodable_alleles():
+    # swine families like "07we" don't fit in an integer key
+    alleles = AlleleSet(["SLA-2*07we01", "A*02:01"])
+    ok_(alleles.matches(["SLA-2*07we01"]))
+    ok_(not alleles.matches(["SLA-2*07we02"]))
+    ok_(alleles.matches(["SLA-2*07we02"], resolution="family"))
+
+
+def test_allele_set_contains_junk():
+    alleles = AlleleSet(["A*02:01"])
+    ok_("not an allele" not in alleles)
+    ok_("" not in alleles)
+    ok_(None not in alleles)
@@ -1,6 +1,28 @@
-from nose.tools import raises
-from mhcnames import normalize_allele_name, AlleleParseError
+from nose.tools import raises, eq_
+from mhcnames import (
+    normalize_allele_name,
+    compact_allele_name,
+    parse_allele_name,
+    parse_classi_or_classii_allele_name,
+    AlleleParseError,
+    MAX_ALLELE_NAME_LENGTH,
+)
 
 @raises(AlleleParseError)
 def test_extra_text_after_allele():
-    normalize_allele_name("HLA-A*02:01 zipper")
\ No newline at end of file
+    normalize_allele_name("HLA-A*02:01 zipper")
+
+def test_reject_names_over_max_length():
+    too_long = "HLA-A*02:01" + " " * MAX_ALLELE_NAME_LENGTH
+    eq_(normalize_allele_name(too_long[:MAX_ALLELE_NAME_LENGTH]), "HLA-A*02:01")
+    for fn in [normalize_allele_name,
+               compact_allele_name,
+               parse_allele_name,
+               parse_classi_or_classii_allele_name]:
+        try:
+            fn(too_long)
+        except AlleleParseError:
+            pass
+        else:
+            raise AssertionError("%s accepted a name longer than %d" % (
+                fn.__name__, MAX_ALLELE_NAME_LENGTH))
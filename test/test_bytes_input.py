@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+
+from nose.tools import eq_, raises
+
+from mhcnames import (
+    AlleleName,
+    AlleleParseError,
+    parse_allele_name_bytes,
+    normalize_allele_name_bytes,
+    compact_allele_name_bytes,
+    iter_normalized_alleles_in_file,
+)
+from mhcnames import bytes_input
+
+
+def test_parse_allele_name_bytes():
+    eq_(parse_allele_name_bytes(b"HLA-A*02:01"),
+        AlleleName("HLA", "A", "02", "01"))
+    eq_(parse_allele_name_bytes(memoryview(b"xxA0201")[2:]),
+        AlleleName("HLA", "A", "02", "01"))
+
+
+def test_normalize_allele_name_bytes():
+    buffer = bytearray(b"hla-a*0201\tDRB1_0102")
+    first = normalize_allele_name_bytes(memoryview(buffer)[:10])
+    eq_(first, "HLA-A*02:01")
+    # same spelling from a different buffer gives back the same object
+    second = normalize_allele_name_bytes(b"hla-a*0201")
+    assert first is second
+    eq_(normalize_allele_name_bytes(buffer[11:]), "HLA-DRA1*01:01-DRB1*01:02")
+    eq_(compact_allele_name_bytes(buffer[11:]), "DRB10102")
+
+
+@raises(AlleleParseError)
+def test_normalize_allele_name_bytes_bad_encoding():
+    normalize_allele_name_bytes(b"HLA-A*02:01\xff")
+
+
+def write_temp_file(contents):
+    path = os.path.join(tempfile.mkdtemp(), "alleles.tsv")
+    with open(path, "wb") as f:
+        f.write(contents)
+    return path
+
+
+def test_iter_normalized_alleles_in_file():
+    path = write_temp_file(
+        b"#sample\tallele\n"
+        b"s1\tA0201\n"
+        b"\n"
+        b"s2\tH2-Kd\textra\r\n"
+        b"s3\n"
+        b"s4\tnot an allele\n"
+        b"s5\tB*07:02")
+    eq_(list(iter_normalized_alleles_in_file(
+            path, column=1, raise_on_error=False)),
+        ["HLA-A*02:01", "H-2-Kd", None, None, "HLA-B*07:02"])
+    shutil.rmtree(os.path.dirname(path))
+
+
+@raises(AlleleParseError)
+def test_iter_normalized_alleles_in_file_missing_column():
+    path = write_temp_file(b"s1\tA0201\ns3\n")
+    try:
+        list(iter_normalized_alleles_in_file(path, column=1))
+    finally:
+        shutil.rmtree(os.path.dirname(path))
+
+
+def test_iter_normalized_alleles_in_empty_file():
+    path = write_temp_file(b"")
+    eq_(list(iter_normalized_alleles_in_file(path)), [])
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_iter_normalized_alleles_in_first_column():
+    path = write_temp_file(b"A0201\n\n\r\n#comment\nH2-Kd\r\nB*07:02")
+    eq_(list(iter_normalized_alleles_in_file(path)),
+        ["HLA-A*02:01", "H-2-Kd", "HLA-B*07:02"])
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_iter_normalized_alleles_across_chunks():
+    lines = [b"s%d\t%s" % (i, name) for i, name in enumerate(
+        [b"A0201", b"B*07:02", b"H2-Kd"] * 20)]
+    path = write_temp_file(b"\n".join(lines) + b"\n")
+    chunk_size = bytes_input._CHUNK_SIZE
+    bytes_input._CHUNK_SIZE = 16
+    try:
+        eq_(list(iter_normalized_alleles_in_file(path, column=1)),
+            ["HLA-A*02:01", "HLA-B*07:02", "H-2-Kd"] * 20)
+    finally:
+        bytes_input._CHUNK_SIZE = chunk_size
+        shutil.rmtree(os.path.dirname(path))
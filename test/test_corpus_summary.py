@@ -0,0 +1,77 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from nose.tools import eq_
+
+from mhcnames import summarize_alleles
+from mhcnames.cli import main
+
+names = [
+    "HLA-A*02:01",
+    "A0201",
+    "B*07:02",
+    "DRB1*15:01",
+    "HLA-DPA1*01:05-DPB1*100:01",
+    "H2-Kd",
+    "H2-IAb",
+    "Mamu-B*082:02",
+    "not an allele",
+    "A0201",
+]
+
+
+def test_summarize_alleles():
+    summary = summarize_alleles(iter(names))
+    eq_(summary.n_alleles, 10)
+    eq_(summary.n_distinct, 9)
+    eq_(summary.species_counts, {"HLA": 6, "H-2": 2, "Mamu": 1})
+    eq_(summary.gene_counts, {
+        "HLA-A": 3,
+        "HLA-B": 1,
+        "HLA-DRB1": 1,
+        "HLA-DPA1": 1,
+        "HLA-DPB1": 1,
+        "H-2-K": 1,
+        "H-2-IA": 1,
+        "Mamu-B": 1,
+    })
+    eq_(summary.class_counts, {"I": 6, "II": 3})
+    eq_(summary.class_indices["II"], [3, 4, 6])
+    eq_(summary.gene_indices["HLA-A"], [0, 1, 9])
+    eq_(summary.species_indices["H-2"], [5, 6])
+    eq_(summary.unparseable_count, 1)
+    eq_(summary.unparseable_indices, [8])
+
+
+def test_summarize_mouse_class2_chains():
+    summary = summarize_alleles(["H-2-Ea", "H-2-Ab", "H-2-IEk", "H-2-Dd"])
+    eq_(summary.class_counts, {"I": 1, "II": 3})
+
+
+def test_summarize_missing_values():
+    summary = summarize_alleles(["A0201", None, float("nan"), "B0702"])
+    eq_(summary.n_alleles, 4)
+    eq_(summary.n_distinct, 2)
+    eq_(summary.unparseable_indices, [1, 2])
+
+
+def test_summarize_command():
+    directory = tempfile.mkdtemp()
+    input_path = os.path.join(directory, "alleles.txt")
+    output_path = os.path.join(directory, "summary.txt")
+    with open(input_path, "w") as f:
+        f.write("\n".join(names))
+    stdout = sys.stdout
+    try:
+        with open(output_path, "w") as sys.stdout:
+            eq_(main(["summarize", input_path]), 0)
+    finally:
+        sys.stdout = stdout
+    with open(output_path) as f:
+        lines = f.read().splitlines()
+    shutil.rmtree(directory)
+    eq_(lines[:3], ["alleles\t10", "distinct\t9", "unparseable\t1"])
+    assert "HLA-A\t3" in lines
+    assert "II\t3" in lines
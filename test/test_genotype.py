@@ -0,0 +1,80 @@
+from nose.tools import eq_, ok_, raises
+
+from mhcnames import (
+    AlleleName,
+    AlleleParseError,
+    parse_genotype,
+    parse_genotypes,
+)
+
+A0201 = AlleleName("HLA", "A", "02", "01")
+A0301 = AlleleName("HLA", "A", "03", "01")
+
+
+def test_parse_genotype_with_ambiguity():
+    genotype = parse_genotype("A*02:01/A*03:01, B*07:02 B*08:01, DRB1*15:01")
+    eq_([(locus.species, locus.gene) for locus in genotype.loci],
+        [("HLA", "A"), ("HLA", "B"), ("HLA", "DRB1")])
+    a = genotype.locus("A")
+    eq_(a.alleles, ((A0201, A0301),))
+    ok_(a.ambiguous)
+    b = genotype.locus("B")
+    eq_(b.alleles, (
+        (AlleleName("HLA", "B", "07", "02"),),
+        (AlleleName("HLA", "B", "08", "01"),)))
+    ok_(not b.homozygous)
+    ok_(not b.ambiguous)
+    ok_(genotype.locus("DRB1").homozygous)
+    eq_(genotype.locus("C"), None)
+
+
+def test_parse_genotype_abbreviated_alternatives():
+    genotype = parse_genotype("HLA-A*02:01/03:01+HLA-A*02:01")
+    eq_(genotype.locus("A").alleles, ((A0201, A0301), (A0201,)))
+
+
+def test_parse_serotype_genotype():
+    genotype = parse_genotype("A2 A2 B7 B8")
+    ok_(genotype.locus("A").homozygous)
+    eq_(genotype.locus("A").alleles, ((A0201,), (A0201,)))
+    eq_(len(genotype.locus("B").alleles), 2)
+
+
+def test_parse_genotypes_batch():
+    genotypes = list(parse_genotypes(["A2 A3", "", "Mamu-A*01:01; Mamu-B*082:02"]))
+    eq_(len(genotypes), 3)
+    eq_(genotypes[1].loci, ())
+    eq_(genotypes[2].locus("B", species="Mamu").alleles,
+        ((AlleleName("Mamu", "B", "82", "02"),),))
+
+
+@raises(AlleleParseError)
+def test_parse_genotype_mixed_loci_alternatives():
+    parse_genotype("A*02:01/B*07:02")
+
+
+@raises(AlleleParseError)
+def test_parse_genotype_too_long():
+    parse_genotype("A2 " * 10000)
+
+
+def test_parse_genotype_spaced_slash():
+    genotype = parse_genotype("A*02:01 / A*03:01, B*07:02 /08:02")
+    eq_(genotype.locus("A").alleles, ((A0201, A0301),))
+    eq_(len(genotype.locus("B").alleles[0]), 2)
+
+
+@raises(AlleleParseError)
+def test_parse_genotype_trailing_slash():
+    parse_genotype("A*02:01 / , B*07:02")
+
+
+@raises(AlleleParseError)
+def test_parse_genotype_too_many_alleles_at_locus():
+    parse_genotype("A*02:01 A*02:01 A*02:01")
+
+
+def test_parse_genotype_without_locus_limit():
+    genotype = parse_genotype(
+        "Mamu-B*001:01 Mamu-B*003:01 Mamu-B*008:01", max_alleles_per_locus=None)
+    eq_(len(genotype.locus("B", species="Mamu").alleles), 3)
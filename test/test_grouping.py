@@ -0,0 +1,40 @@
+from nose.tools import eq_, raises
+
+from mhcnames import group_peptides_by_allele, scatter_group_results
+
+peptides = ["SIINFEKL", "SLYNTVATL", "GILGFVFTL", "PKYVKQNTLKLAT", "NLVPMVATV"]
+alleles = ["HLA-A*02:01", "B*07:02", "A0201", "DRB1*01:01", "a*02:01"]
+
+
+def test_group_peptides_by_allele():
+    groups = group_peptides_by_allele(peptides, alleles)
+    eq_(list(groups), [
+        "HLA-A*02:01", "HLA-B*07:02", "HLA-DRA1*01:01-DRB1*01:01"])
+    eq_(groups["HLA-A*02:01"].indices, [0, 2, 4])
+    eq_(groups["HLA-A*02:01"].peptides, ["SIINFEKL", "GILGFVFTL", "NLVPMVATV"])
+    eq_(groups["HLA-DRA1*01:01-DRB1*01:01"].indices, [3])
+
+
+def test_group_class2_with_omit_dra1():
+    groups = group_peptides_by_allele(
+        ["A", "B", "C"],
+        ["DRB1*01:01", "HLA-DRA1*01:01-DRB1*01:01", "DRB1_0101"],
+        omit_dra1=True)
+    eq_(list(groups), ["HLA-DRB1*01:01"])
+    eq_(groups["HLA-DRB1*01:01"].indices, [0, 1, 2])
+
+
+@raises(ValueError)
+def test_group_peptides_by_allele_length_mismatch():
+    group_peptides_by_allele(peptides, alleles[:2])
+
+
+def test_scatter_group_results():
+    groups = group_peptides_by_allele(peptides, alleles)
+    results = {
+        allele: [len(peptide) for peptide in group.peptides]
+        for (allele, group) in groups.items()
+        if allele != "HLA-B*07:02"
+    }
+    eq_(scatter_group_results(groups, results), [8, None, 9, 13, 9])
+    eq_(scatter_group_results(groups, results, fill=-1), [8, -1, 9, 13, 9])
@@ -0,0 +1,83 @@
+import pickle
+import threading
+
+from nose.tools import eq_, ok_, raises
+
+from mhcnames import AlleleParseError, Normalizer
+from mhcnames.normalizer import BoundedCache
+
+
+def test_normalizer_options():
+    eq_(Normalizer()("DRB1*01:01"), "HLA-DRA1*01:01-DRB1*01:01")
+    eq_(Normalizer(omit_dra1=True)("DRB1*01:01"), "HLA-DRB1*01:01")
+    eq_(Normalizer(infer_class2_pair=False)("DRB1*01:01"), "HLA-DRB1*01:01")
+    eq_(Normalizer(compact=True)("HLA-DRB1*01:01"), "DRB10101")
+
+
+def test_normalize_many():
+    normalizer = Normalizer()
+    eq_(normalizer.normalize_many(["A0201", "a*02:01", "H2-Kd"]),
+        ["HLA-A*02:01", "HLA-A*02:01", "H-2-Kd"])
+
+
+def test_normalize_many_missing_values():
+    nan = float("nan")
+    results = Normalizer().normalize_many(["A0201", None, nan])
+    eq_(results[:2], ["HLA-A*02:01", None])
+    assert results[2] is nan
+
+
+@raises(AlleleParseError)
+def test_normalize_many_bad_allele():
+    Normalizer().normalize_many(["A0201", "HLA-A*02:01 zipper"])
+
+
+def test_warm_and_pickle():
+    normalizer = Normalizer(compact=True, max_cache_size=10)
+    eq_(normalizer.warm(["A0201", "A0201", "B*07:02", "zipper zipper"]), 2)
+    normalizer("H2-Kd")
+    copy = pickle.loads(pickle.dumps(normalizer))
+    eq_(copy.known, {"A0201": "A0201", "B*07:02": "B0702"})
+    eq_(copy.compact, True)
+    eq_(copy.max_cache_size, 10)
+    eq_(len(copy._cache), 0)
+    eq_(copy("H2-Kd"), "Kd")
+
+
+def test_known_spellings_take_precedence():
+    normalizer = Normalizer(known={"my-allele": "HLA-A*02:01"})
+    eq_(normalizer("my-allele"), "HLA-A*02:01")
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    cache = BoundedCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    eq_(cache.get("a"), 1)
+    cache["c"] = 3
+    eq_(len(cache), 2)
+    eq_(cache.get("b"), None)
+    eq_(cache.get("a"), 1)
+    eq_(cache.get("c"), 3)
+
+
+def test_bounded_cache_shared_by_threads():
+    cache = BoundedCache(8)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(20000):
+                key = (i + offset) % 16
+                cache[key] = i
+                cache.get(key)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    eq_(errors, [])
+    ok_(len(cache) <= 8)
@@ -0,0 +1,146 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from nose.tools import eq_
+
+from mhcnames import (
+    normalize_allele_name,
+    compact_allele_name,
+    set_persistent_cache,
+    PersistentCache,
+    warm_persistent_cache,
+)
+from mhcnames.cli import main
+from mhcnames.persistent_cache import _version_tuple
+
+
+def make_cache_path():
+    return os.path.join(tempfile.mkdtemp(), "alleles.sqlite")
+
+
+def test_normalization_writes_to_persistent_cache():
+    path = make_cache_path()
+    cache = PersistentCache(path)
+    set_persistent_cache(cache)
+    try:
+        eq_(normalize_allele_name("hla-a*0301"), "HLA-A*03:01")
+        eq_(compact_allele_name("hla-a*0301"), "A0301")
+    finally:
+        set_persistent_cache(None)
+        cache.close()
+    # a second cache object stands in for another process
+    other = PersistentCache(path)
+    eq_(other.get("normalize:0:1", "hla-a*0301"), "HLA-A*03:01")
+    eq_(other.get("compact", "hla-a*0301"), "A0301")
+    eq_(other.get("compact", "B0702"), None)
+    other.close()
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_persistent_cache_is_read():
+    path = make_cache_path()
+    cache = PersistentCache(path)
+    cache.set("compact", "made-up-allele", "XYZ")
+    set_persistent_cache(cache)
+    try:
+        eq_(compact_allele_name("made-up-allele"), "XYZ")
+    finally:
+        set_persistent_cache(None)
+        cache.close()
+    shutil.rmtree(os.path.dirname(path))
+
+
+def count_rows(path):
+    connection = sqlite3.connect(path)
+    n = connection.execute("SELECT COUNT(*) FROM alleles").fetchone()[0]
+    connection.close()
+    return n
+
+
+def test_persistent_cache_invalidated_by_version():
+    path = make_cache_path()
+    old = PersistentCache(path)
+    old.version = "0.0.1"
+    old.set_many([("compact", "A*02:01", "A0201")])
+    old.close()
+    cache = PersistentCache(path)
+    eq_(len(cache), 0)
+    eq_(cache.get("compact", "A*02:01"), None)
+    # opening the cache with a new version deleted the old rows
+    eq_(count_rows(path), 0)
+    cache.close()
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_persistent_cache_ignores_writes_of_older_version():
+    path = make_cache_path()
+    old = PersistentCache(path)
+    old.version = "0.0.1"
+    old.get("compact", "A*02:01")
+    new = PersistentCache(path)
+    new.get("compact", "A*02:01")
+    # an old process keeps writing after the newer one cleared the cache
+    old.set_many([("compact", "A*02:01", "STALE")])
+    eq_(PersistentCache(path).get("compact", "A*02:01"), None)
+    old.close()
+    new.close()
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_older_version_doesnt_empty_persistent_cache():
+    path = make_cache_path()
+    new = PersistentCache(path)
+    new.set_many([("compact", "A*02:01", "A0201")])
+    old = PersistentCache(path)
+    old.version = "0.0.1"
+    eq_(old.get("compact", "A*02:01"), None)
+    old.close()
+    new.close()
+    eq_(PersistentCache(path).get("compact", "A*02:01"), "A0201")
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_version_tuple():
+    assert _version_tuple("0.4.10") > _version_tuple("0.4.9")
+
+
+def test_persistent_cache_buffers_writes():
+    path = make_cache_path()
+    cache = PersistentCache(path, write_batch_size=2)
+    cache.set("compact", "A*02:01", "A0201")
+    eq_(cache.get("compact", "A*02:01"), "A0201")
+    eq_(len(cache), 0)
+    cache.set("compact", "B*07:02", "B0702")
+    eq_(len(cache), 2)
+    cache.set("compact", "C*07:02", "C0702")
+    cache.close()
+    eq_(count_rows(path), 3)
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_warm_persistent_cache():
+    path = make_cache_path()
+    cache = PersistentCache(path)
+    n_cached, n_skipped = warm_persistent_cache(
+        cache, ["A0201", "A0201", "DRB1_0102", "HLA-A*02:01 zipper"])
+    eq_(n_cached, 2)
+    eq_(n_skipped, 1)
+    eq_(cache.get("normalize:0:1", "DRB1_0102"), "HLA-DRA1*01:01-DRB1*01:02")
+    eq_(cache.get("compact", "DRB1_0102"), "DRB10102")
+    cache.close()
+    shutil.rmtree(os.path.dirname(path))
+
+
+def test_warm_cache_command():
+    path = make_cache_path()
+    input_path = os.path.join(os.path.dirname(path), "alleles.txt")
+    with open(input_path, "w") as f:
+        f.write("H2-Kd\nB*07:02\n\n")
+    eq_(main(["warm-cache", "--cache", path, input_path]), 0)
+    cache = PersistentCache(path)
+    eq_(cache.get("normalize:0:1", "H2-Kd"), "H-2-Kd")
+    eq_(cache.get("compact", "B*07:02"), "B0702")
+    cache.close()
+    shutil.rmtree(os.path.dirname(path))
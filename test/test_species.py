@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from nose.tools import eq_, ok_, raises
+
+from mhcnames import prefix_to_species_name
+from mhcnames.species import (
+    _all_prefixes,
+    _lookup_species_prefix,
+    _search_species_prefix,
+)
+
+
+def test_species_prefix_table_matches_search():
+    names = ["HLA-A*02:01", "hla_a0201", "HLA:A:02:01", "HLA A*02:01", "HLA",
+             "HLA-", "HLA--A2-", "A*02:01", "H2-Kd", "H-2-Kd", "H2Kd", "h2",
+             "Mamu-B*082:02", "MAMU_B08202", "mamu", "RT1-Bb*u", "Ovca-A",
+             u"ſla-1*01:01", u"ßla-1*01:01", "", "-", "Sasc-A1"]
+    names += [prefix + sep + "A" for prefix in _all_prefixes for sep in "-:_ *"]
+    names += [prefix.lower() for prefix in _all_prefixes]
+    for name in names:
+        for seps in ["-:_ ", "", "*"]:
+            eq_(_lookup_species_prefix(name, seps),
+                _search_species_prefix(name, seps))
+
+
+def test_prefix_to_species_name_ignores_case():
+    eq_(prefix_to_species_name["HLA"], "human")
+    eq_(prefix_to_species_name["hla"], "human")
+    eq_(prefix_to_species_name["MAMU"], "rhesus_macaque")
+    eq_(prefix_to_species_name.get("h-2"), "mouse")
+    eq_(prefix_to_species_name.get("XYZ"), None)
+    ok_("rt1" in prefix_to_species_name)
+    ok_("XYZ" not in prefix_to_species_name)
+
+
+@raises(KeyError)
+def test_prefix_to_species_name_missing():
+    prefix_to_species_name["XYZ"]
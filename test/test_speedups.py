@@ -0,0 +1,128 @@
+"""
+Differential tests checking that the optional compiled parsing helpers
+give exactly the same results as the pure Python implementation.
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+from unittest import SkipTest
+
+from nose.tools import eq_
+from six import string_types
+
+from mhcnames import normalize_allele_name, compact_allele_name
+from mhcnames.parsing_helpers import (
+    MAX_ALLELE_NAME_LENGTH,
+    speedups,
+    pure_python_helpers,
+)
+from mhcnames.species import _search_species_prefix, _all_prefixes
+
+# names which the other tests don't use, e.g. malformed or unusual input
+extra_names = [
+    "HLA-A*02:01 zipper", "", "HLA-", "HLA-A*02:01:01:01", "A*02:01:01G",
+    u"\u017fla-1*01:01", u"HLA-A*\u0662\u0660:01", "H2", "x", "-:_ ",
+]
+
+
+def string_literals_in_tests():
+    """
+    Every string literal in the other test modules short enough to be an
+    allele name, so new test names are covered without being copied here.
+    """
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    literals = set()
+    for filename in sorted(os.listdir(test_dir)):
+        if not filename.startswith("test_") or not filename.endswith(".py"):
+            continue
+        if filename == os.path.basename(__file__).replace(".pyc", ".py"):
+            continue
+        # parsed as bytes so the source's own encoding declaration is used
+        with open(os.path.join(test_dir, filename), "rb") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            # string literals are ast.Str on Python 2 and ast.Constant later
+            node_type = type(node).__name__
+            if node_type == "Constant":
+                value = node.value
+            elif node_type == "Str":
+                value = node.s
+            else:
+                continue
+            if isinstance(value, string_types) and (
+                    len(value) <= MAX_ALLELE_NAME_LENGTH):
+                literals.add(value)
+    return sorted(literals)
+
+
+corpus = string_literals_in_tests() + extra_names
+
+
+def require_speedups():
+    if speedups is None:
+        raise SkipTest("mhcnames._speedups extension not built")
+
+
+def run_or_error(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return type(e).__name__
+
+
+def test_parsing_helpers_match_pure_python():
+    require_speedups()
+    for name, pure_fn in pure_python_helpers.items():
+        compiled_fn = getattr(speedups, name)
+        for allele in corpus:
+            for start in range(len(allele) + 1):
+                suffix = allele[start:]
+                if name == "parse_until":
+                    for sep in [":", "*", "-", "", "**"]:
+                        eq_(compiled_fn(suffix, sep), pure_fn(suffix, sep))
+                else:
+                    for max_len in [None, -1, 0, 1, 2, 3, 4, 100]:
+                        eq_(compiled_fn(suffix, max_len),
+                            pure_fn(suffix, max_len=max_len))
+
+
+def test_split_species_prefix_matches_pure_python():
+    require_speedups()
+    for allele in corpus:
+        for seps in ["-:_ ", "", "*"]:
+            eq_(speedups.split_prefix(allele, _all_prefixes, seps),
+                _search_species_prefix(allele, seps))
+
+
+def test_normalization_matches_pure_python():
+    require_speedups()
+    script = (
+        "import json, sys\n"
+        "import mhcnames\n"
+        "from mhcnames.parsing_helpers import speedups\n"
+        "assert speedups is None\n"
+        "def run(fn, name):\n"
+        "    try:\n"
+        "        return fn(name)\n"
+        "    except Exception as e:\n"
+        "        return type(e).__name__\n"
+        "corpus = json.load(sys.stdin)\n"
+        "json.dump([[run(mhcnames.normalize_allele_name, name),\n"
+        "            run(mhcnames.compact_allele_name, name)]\n"
+        "           for name in corpus], sys.stdout)\n")
+    env = dict(os.environ, MHCNAMES_DISABLE_SPEEDUPS="1")
+    process = subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    stdout, _ = process.communicate(json.dumps(corpus).encode("utf-8"))
+    eq_(process.returncode, 0)
+    expected = json.loads(stdout.decode("utf-8"))
+    for name, (normalized, compact) in zip(corpus, expected):
+        eq_(run_or_error(normalize_allele_name, name), normalized)
+        eq_(run_or_error(compact_allele_name, name), compact)
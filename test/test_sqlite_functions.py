@@ -0,0 +1,95 @@
+import sqlite3
+from unittest import SkipTest
+
+from nose.tools import eq_, raises
+
+from mhcnames import AlleleParseError, register_sqlite_functions
+from mhcnames.normalizer import BoundedCache
+from mhcnames.sqlite_functions import _null_on_error
+
+
+def make_connection(alleles, **kwargs):
+    connection = sqlite3.connect(":memory:")
+    register_sqlite_functions(connection, **kwargs)
+    connection.execute("CREATE TABLE samples (id INTEGER, allele TEXT)")
+    connection.executemany(
+        "INSERT INTO samples VALUES (?, ?)", enumerate(alleles))
+    return connection
+
+
+def column(connection, query):
+    return [row[0] for row in connection.execute(query)]
+
+
+def test_update_with_mhc_normalize():
+    connection = make_connection(["A0201", "hla-a*02:01", "H2-Kd", "DRB1*01:01"])
+    connection.execute("UPDATE samples SET allele = mhc_normalize(allele)")
+    eq_(column(connection, "SELECT allele FROM samples ORDER BY id"),
+        ["HLA-A*02:01", "HLA-A*02:01", "H-2-Kd", "HLA-DRA1*01:01-DRB1*01:01"])
+
+
+def test_mhc_normalize_options():
+    connection = make_connection(["DRB1*01:01"], omit_dra1=True)
+    eq_(column(connection, "SELECT mhc_normalize(allele) FROM samples"),
+        ["HLA-DRB1*01:01"])
+
+
+def test_mhc_compact():
+    connection = make_connection(["HLA-A*02:01", "DRB1*01:01"])
+    eq_(column(connection, "SELECT mhc_compact(allele) FROM samples ORDER BY id"),
+        ["A0201", "DRB10101"])
+
+
+def test_group_by_species_and_gene():
+    connection = make_connection(
+        ["A*02:01", "A*03:01", "B*07:02", "H2-Kd", "DPA1*01:03/DPB1*04:01"])
+    eq_(connection.execute(
+        "SELECT mhc_species(allele), mhc_gene(allele), COUNT(*) "
+        "FROM samples GROUP BY 1, 2 ORDER BY 1, 2").fetchall(),
+        [("H-2", "K", 1), ("HLA", "A", 2), ("HLA", "B", 1),
+         ("HLA", "DPA1-DPB1", 1)])
+
+
+def test_null_and_unparseable_values():
+    connection = make_connection([None, "", "HLA-A*02:01 junk", 42])
+    for function_name in ["mhc_normalize", "mhc_compact", "mhc_species", "mhc_gene"]:
+        eq_(column(
+            connection,
+            "SELECT %s(allele) FROM samples ORDER BY id" % function_name),
+            [None] * 4)
+
+
+def test_unparseable_values_parsed_once():
+    calls = []
+    failures = BoundedCache(10)
+
+    def parse(name):
+        calls.append(name)
+        raise AlleleParseError(name)
+
+    fn = _null_on_error(parse, failures)
+    eq_([fn("junk"), fn("junk"), fn(None)], [None, None, None])
+    eq_(calls, ["junk"])
+
+
+@raises(sqlite3.OperationalError)
+def test_no_expression_index_with_other_options():
+    # indexes built with other options would be wrong for connections
+    # registering the defaults
+    connection = make_connection(["A0201"], omit_dra1=True)
+    connection.execute(
+        "CREATE INDEX normalized_allele ON samples (mhc_normalize(allele))")
+
+
+def test_expression_index():
+    connection = make_connection(["A0201", "B0702"])
+    try:
+        connection.execute(
+            "CREATE INDEX normalized_allele ON samples (mhc_normalize(allele))")
+    except sqlite3.OperationalError:
+        raise SkipTest(
+            "Functions can't be marked deterministic with this Python or SQLite")
+    eq_(column(
+        connection,
+        "SELECT id FROM samples WHERE mhc_normalize(allele) = 'HLA-B*07:02'"),
+        [1])
@@ -0,0 +1,54 @@
+from nose.tools import eq_, ok_, raises
+
+from mhcnames import (
+    AlleleParseError,
+    generate_allele_names,
+    normalize_allele_name,
+)
+
+
+def test_synthetic_alleles_normalize_as_expected():
+    n_malformed = 0
+    for name, expected in generate_allele_names(20000, seed=1):
+        if expected is None:
+            n_malformed += 1
+            try:
+                normalize_allele_name(name)
+            except (AlleleParseError, ValueError):
+                continue
+            raise AssertionError("Expected '%s' to be rejected" % name)
+        eq_(normalize_allele_name(name), expected)
+    # default malformed fraction is 5%
+    ok_(800 < n_malformed < 1200)
+
+
+def test_synthetic_alleles_are_deterministic():
+    eq_(list(generate_allele_names(100, seed=7)),
+        list(generate_allele_names(100, seed=7)))
+    ok_(list(generate_allele_names(100, seed=7)) !=
+        list(generate_allele_names(100, seed=8)))
+
+
+def test_synthetic_alleles_same_on_python_2_and_3():
+    # recorded once, so any change to the stream (e.g. from a different
+    # Python version) shows up here
+    eq_([allele.name for allele in generate_allele_names(4, seed=1)],
+        ["HLA:C:26:81", "C:01:42", "Lero-B*005:53", "c*56:34"])
+
+
+def test_synthetic_alleles_weights():
+    for name, expected in generate_allele_names(
+            200, weights={"mouse": 1}, malformed_fraction=0):
+        ok_(expected.startswith("H-2-"))
+
+
+def test_extended_resolution_expected_names_have_two_fields():
+    for name, expected in generate_allele_names(
+            200, extended_resolution=True, malformed_fraction=0,
+            weights={"human_class1": 1}):
+        eq_(expected.count(":"), 1)
+
+
+@raises(ValueError)
+def test_synthetic_alleles_unknown_kind():
+    list(generate_allele_names(1, weights={"zebrafish": 1}))